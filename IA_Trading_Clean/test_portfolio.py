@@ -38,28 +38,31 @@ def test_portfolio():
         total_usd = 0.0
         asset_count = 0
         
-        for currency, amounts in balance.items():
-            if currency not in ['info', 'free', 'used', 'total'] and amounts.get('total', 0) > 0:
-                total = amounts.get('total', 0)
-                free = amounts.get('free', 0)
-                used = amounts.get('used', 0)
-                
-                asset_count += 1
-                
-                # Calcul valeur USD
-                usd_value = 0.0
-                if currency == 'USD':
-                    usd_value = total
+        # Seuls les soldes non nuls de balance['total'] sont parcourus
+        totals = balance.get('total') or {}
+        free_amounts = balance.get('free') or {}
+        used_amounts = balance.get('used') or {}
+        
+        for currency, total in [(c, v) for c, v in totals.items() if v and v > 0]:
+            free = free_amounts.get(currency, 0)
+            used = used_amounts.get(currency, 0)
+            
+            asset_count += 1
+            
+            # Calcul valeur USD
+            usd_value = 0.0
+            if currency == 'USD':
+                usd_value = total
+                total_usd += usd_value
+                print(f"💵 {currency:>8}: {total:>15.8f} | Libre: {free:>12.8f} | ${usd_value:>10.2f}")
+            else:
+                try:
+                    ticker = exchange.fetch_ticker(f"{currency}/USD")
+                    usd_value = total * ticker['last']
                     total_usd += usd_value
-                    print(f"💵 {currency:>8}: {total:>15.8f} | Libre: {free:>12.8f} | ${usd_value:>10.2f}")
-                else:
-                    try:
-                        ticker = exchange.fetch_ticker(f"{currency}/USD")
-                        usd_value = total * ticker['last']
-                        total_usd += usd_value
-                        print(f"🪙 {currency:>8}: {total:>15.8f} | Libre: {free:>12.8f} | ${usd_value:>10.2f}")
-                    except Exception as e:
-                        print(f"❌ {currency:>8}: {total:>15.8f} | Libre: {free:>12.8f} | Prix indisponible")
+                    print(f"🪙 {currency:>8}: {total:>15.8f} | Libre: {free:>12.8f} | ${usd_value:>10.2f}")
+                except Exception as e:
+                    print(f"❌ {currency:>8}: {total:>15.8f} | Libre: {free:>12.8f} | Prix indisponible")
         
         print("-" * 60)
         print(f"📊 TOTAL ASSETS: {asset_count}")
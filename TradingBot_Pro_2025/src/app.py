@@ -1,6 +1,8 @@
 import os
 import time
+import functools
 import logging
+import threading
 from flask import Flask, jsonify, send_from_directory, request
 from flask_cors import CORS
 from flask_limiter import Limiter
@@ -53,6 +55,52 @@ limiter.init_app(app)
 # Setup logging
 logger = get_logger(__name__)
 
+@functools.lru_cache(maxsize=1)
+def _load_coinbase_credentials():
+    """Load .env and return the Coinbase API key pair."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return os.getenv('COINBASE_API_KEY'), os.getenv('COINBASE_SECRET_KEY')
+
+def get_coinbase_credentials():
+    """Coinbase API key pair, cached only once both keys are set (re-read until configured)."""
+    credentials = _load_coinbase_credentials()
+    if not all(credentials):
+        _load_coinbase_credentials.cache_clear()
+    return credentials
+
+# Sync ccxt clients are not thread-safe (rate limiter, session, last response): one per Flask thread
+_exchange_local = threading.local()
+
+def get_coinbase_exchange(sandbox=False):
+    """Per-thread Coinbase client: keeps its HTTP connections, markets and rate limiter across requests."""
+    clients = getattr(_exchange_local, 'clients', None)
+    if clients is None:
+        clients = _exchange_local.clients = {}
+    
+    exchange = clients.get(sandbox)
+    if exchange is None:
+        import ccxt
+        
+        api_key, secret_key = get_coinbase_credentials()
+        # Bound every REST call so a stalled endpoint cannot hang a request worker
+        timeout_ms = int(float(os.getenv('API_CHECK_TIMEOUT', '10.0')) * 1000)
+        exchange = ccxt.coinbaseadvanced({
+            'apiKey': api_key,
+            'secret': secret_key,
+            'enableRateLimit': True,
+            'sandbox': sandbox,
+            'timeout': timeout_ms,
+        })
+        # A client built without keys is not kept: the next call retries once .env is filled in
+        if api_key and secret_key:
+            clients[sandbox] = exchange
+    return exchange
+
+def format_error(e, limit=50):
+    """Short error text for API responses: exception type plus truncated message."""
+    return f"{type(e).__name__}: {str(e)[:limit]}"
+
 # Determine the correct static folder path
 static_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'public'))
 app.static_folder = static_folder
@@ -336,14 +384,7 @@ def reset_emergency_stop():
 def get_portfolio():
     """API endpoint to get real portfolio data from Coinbase."""
     try:
-        import ccxt
-        from dotenv import load_dotenv
-        
-        # Charger les variables d'environnement
-        load_dotenv()
-        
-        api_key = os.getenv('COINBASE_API_KEY')
-        secret_key = os.getenv('COINBASE_SECRET_KEY')
+        api_key, secret_key = get_coinbase_credentials()
         
         if not api_key or not secret_key:
             return jsonify({
@@ -356,11 +397,7 @@ def get_portfolio():
             }), 400
         
         # Connexion à Coinbase
-        exchange = ccxt.coinbaseadvanced({
-            'apiKey': api_key,
-            'secret': secret_key,
-            'enableRateLimit': True,
-        })
+        exchange = get_coinbase_exchange()
         
         # Récupérer le balance
         balance = exchange.fetch_balance()
@@ -377,38 +414,42 @@ def get_portfolio():
         assets = []
         total_value_usd = 0
         
-        for asset, info in balance.items():
-            if isinstance(info, dict) and info.get('total', 0) > 0:
-                total = info.get('total', 0)
-                free = info.get('free', 0)
-                used = info.get('used', 0)
-                
-                # Calculer la valeur en USD si possible
-                asset_value_usd = 0
-                if asset == 'USD':
-                    asset_value_usd = total
-                elif asset == 'USDC' or asset == 'PYUSD':
-                    asset_value_usd = total  # Stablecoins
-                elif asset == 'EUR':
-                    asset_value_usd = total * 1.1  # Approximation EUR vers USD
-                else:
-                    # Essayer de trouver le prix dans les tickers
-                    symbol = f"{asset}/USD"
-                    if symbol in tickers and 'last' in tickers[symbol]:
-                        asset_value_usd = total * tickers[symbol]['last']
-                    elif f"{asset}/USDT" in tickers and 'last' in tickers[f"{asset}/USDT"]:
-                        asset_value_usd = total * tickers[f"{asset}/USDT"]['last']
-                
-                assets.append({
-                    "symbol": asset,
-                    "name": asset,
-                    "balance": total,
-                    "available": free,
-                    "locked": used,
-                    "value_usd": round(asset_value_usd, 2)
-                })
-                
-                total_value_usd += asset_value_usd
+        # ccxt fournit déjà les montants par symbole : seuls les soldes non nuls sont parcourus
+        totals = balance.get('total') or {}
+        free_amounts = balance.get('free') or {}
+        used_amounts = balance.get('used') or {}
+        positive_assets = [(asset, total) for asset, total in totals.items() if total and total > 0]
+        
+        for asset, total in positive_assets:
+            free = free_amounts.get(asset, 0)
+            used = used_amounts.get(asset, 0)
+            
+            # Calculer la valeur en USD si possible
+            asset_value_usd = 0
+            if asset == 'USD':
+                asset_value_usd = total
+            elif asset == 'USDC' or asset == 'PYUSD':
+                asset_value_usd = total  # Stablecoins
+            elif asset == 'EUR':
+                asset_value_usd = total * 1.1  # Approximation EUR vers USD
+            else:
+                # Essayer de trouver le prix dans les tickers
+                symbol = f"{asset}/USD"
+                if symbol in tickers and 'last' in tickers[symbol]:
+                    asset_value_usd = total * tickers[symbol]['last']
+                elif f"{asset}/USDT" in tickers and 'last' in tickers[f"{asset}/USDT"]:
+                    asset_value_usd = total * tickers[f"{asset}/USDT"]['last']
+            
+            assets.append({
+                "symbol": asset,
+                "name": asset,
+                "balance": total,
+                "available": free,
+                "locked": used,
+                "value_usd": round(asset_value_usd, 2)
+            })
+            
+            total_value_usd += asset_value_usd
         
         return jsonify({
             "portfolio": {
@@ -425,7 +466,7 @@ def get_portfolio():
     except Exception as e:
         logger.error(f"Error fetching portfolio: {str(e)}")
         return jsonify({
-            "error": f"Failed to fetch portfolio: {str(e)[:50]}",
+            "error": f"Failed to fetch portfolio: {format_error(e)}",
             "portfolio": {
                 "total_value": 0,
                 "assets": [],
@@ -453,25 +494,13 @@ def test_trade():
         if side not in ['buy', 'sell']:
             return jsonify({"error": "Side must be 'buy' or 'sell'"}), 400
         
-        import ccxt
-        from dotenv import load_dotenv
-        
-        # Charger les variables d'environnement
-        load_dotenv()
-        
-        api_key = os.getenv('COINBASE_API_KEY')
-        secret_key = os.getenv('COINBASE_SECRET_KEY')
+        api_key, secret_key = get_coinbase_credentials()
         
         if not api_key or not secret_key:
             return jsonify({"error": "API keys not configured"}), 400
         
-        # Connexion à Coinbase
-        exchange = ccxt.coinbaseadvanced({
-            'apiKey': api_key,
-            'secret': secret_key,
-            'enableRateLimit': True,
-            'sandbox': True,  # Mode test - changez à False pour les vrais trades
-        })
+        # Connexion à Coinbase (mode test - passez sandbox=False pour les vrais trades)
+        exchange = get_coinbase_exchange(sandbox=True)
         
         # Récupérer le prix actuel pour information
         ticker = exchange.fetch_ticker(symbol)
@@ -508,7 +537,7 @@ def test_trade():
     except Exception as e:
         logger.error(f"Error executing test trade: {str(e)}")
         return jsonify({
-            "error": f"Failed to execute test trade: {str(e)[:100]}",
+            "error": f"Failed to execute test trade: {format_error(e, 100)}",
             "success": False
         }), 500
 
@@ -555,7 +584,7 @@ def configure_ai():
         
     except Exception as e:
         logger.error(f"Error configuring AI: {str(e)}")
-        return jsonify({"error": f"Erreur configuration IA: {str(e)[:50]}"}), 500
+        return jsonify({"error": f"Erreur configuration IA: {format_error(e)}"}), 500
 
 @app.route('/api/ai-recommendation', methods=['POST'])
 @limiter.limit("10 per minute")
@@ -565,24 +594,13 @@ def get_ai_recommendation():
         data = request.get_json()
         symbol = data.get('symbol', 'BTC/USD')
         
-        import ccxt
-        from dotenv import load_dotenv
-        
-        # Charger les variables d'environnement
-        load_dotenv()
-        
-        api_key = os.getenv('COINBASE_API_KEY')
-        secret_key = os.getenv('COINBASE_SECRET_KEY')
+        api_key, secret_key = get_coinbase_credentials()
         
         if not api_key or not secret_key:
             return jsonify({"error": "API keys not configured"}), 400
         
         # Connexion à Coinbase
-        exchange = ccxt.coinbaseadvanced({
-            'apiKey': api_key,
-            'secret': secret_key,
-            'enableRateLimit': True,
-        })
+        exchange = get_coinbase_exchange()
         
         # Récupérer les données de marché
         symbols = ['BTC/USD', 'ETH/USD', 'SOL/USD', 'ATOM/USD']
@@ -624,7 +642,7 @@ def get_ai_recommendation():
     except Exception as e:
         logger.error(f"Error getting AI recommendation: {str(e)}")
         return jsonify({
-            "error": f"Erreur recommandation IA: {str(e)[:100]}",
+            "error": f"Erreur recommandation IA: {format_error(e, 100)}",
             "success": False
         }), 500
 
@@ -637,25 +655,13 @@ def execute_ai_auto_trade():
         symbol = data.get('symbol', 'BTC/USD')
         force_execute = data.get('force_execute', False)  # Pour forcer même en mode simulation
         
-        import ccxt
-        from dotenv import load_dotenv
-        
-        # Charger les variables d'environnement
-        load_dotenv()
-        
-        api_key = os.getenv('COINBASE_API_KEY')
-        secret_key = os.getenv('COINBASE_SECRET_KEY')
+        api_key, secret_key = get_coinbase_credentials()
         
         if not api_key or not secret_key:
             return jsonify({"error": "API keys not configured"}), 400
         
         # Connexion à Coinbase en mode DEMO (paper trading)
-        exchange = ccxt.coinbaseadvanced({
-            'apiKey': api_key,
-            'secret': secret_key,
-            'enableRateLimit': True,
-            'sandbox': False,  # Coinbase Advanced n'a pas de sandbox
-        })
+        exchange = get_coinbase_exchange()  # Coinbase Advanced n'a pas de sandbox
         
         # Configuration pour mode demo/simulation
         demo_mode = True  # Force le mode démo pour les tests
@@ -756,7 +762,7 @@ def execute_ai_auto_trade():
     except Exception as e:
         logger.error(f"Error executing AI auto-trade: {str(e)}")
         return jsonify({
-            "error": f"Erreur trade automatique IA: {str(e)[:100]}",
+            "error": f"Erreur trade automatique IA: {format_error(e, 100)}",
             "success": False
         }), 500
 
@@ -780,7 +786,7 @@ def get_ai_status():
     except Exception as e:
         logger.error(f"Error getting AI status: {str(e)}")
         return jsonify({
-            "error": f"Erreur statut IA: {str(e)[:50]}",
+            "error": f"Erreur statut IA: {format_error(e)}",
             "success": False
         }), 500
 
@@ -789,24 +795,13 @@ def get_ai_status():
 def get_market_data():
     """API endpoint to get market data for trading."""
     try:
-        import ccxt
-        from dotenv import load_dotenv
-        
-        # Charger les variables d'environnement
-        load_dotenv()
-        
-        api_key = os.getenv('COINBASE_API_KEY')
-        secret_key = os.getenv('COINBASE_SECRET_KEY')
+        api_key, secret_key = get_coinbase_credentials()
         
         if not api_key or not secret_key:
             return jsonify({"error": "API keys not configured"}), 400
         
         # Connexion à Coinbase
-        exchange = ccxt.coinbaseadvanced({
-            'apiKey': api_key,
-            'secret': secret_key,
-            'enableRateLimit': True,
-        })
+        exchange = get_coinbase_exchange()
         
         # Symboles populaires pour trading
         symbols = ['BTC/USD', 'ETH/USD', 'SOL/USD', 'ATOM/USD']
@@ -835,7 +830,7 @@ def get_market_data():
     except Exception as e:
         logger.error(f"Error fetching market data: {str(e)}")
         return jsonify({
-            "error": f"Failed to fetch market data: {str(e)[:50]}",
+            "error": f"Failed to fetch market data: {format_error(e)}",
             "market_data": []
         }), 500
 
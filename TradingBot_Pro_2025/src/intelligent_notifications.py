@@ -15,11 +15,52 @@ import smtplib
 from email.mime.text import MimeText
 from email.mime.multipart import MimeMultipart
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 from abc import ABC, abstractmethod
 
 logger = logging.getLogger(__name__)
 
+class _NotificationRetry(Retry):
+    """Rejeu sur Retry-After limité aux 429 (jamais de POST renvoyé sur 503), attentes plafonnées"""
+    RETRY_AFTER_STATUS_CODES = frozenset({429})
+    # Le thread d'envoi dort hors de asyncio.timeout: chaque attente doit rester courte
+    RETRY_AFTER_MAX = 2.0
+    DEFAULT_BACKOFF_MAX = 2.0
+
+    def get_retry_after(self, response):
+        """Délai Retry-After du serveur, borné à RETRY_AFTER_MAX"""
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.RETRY_AFTER_MAX)
+
+def _create_http_session() -> requests.Session:
+    """Session HTTP partagée (keep-alive) pour Telegram, Discord et webhooks"""
+    session = requests.Session()
+    # Les POST ne sont pas idempotents: on ne rejoue que ce que le serveur n'a pas pu traiter,
+    # échec de connexion (requête jamais envoyée) ou 429 (refus, délai Retry-After plafonné).
+    # Pas de rejeu sur erreur de lecture ni sur 5xx: le message a pu être accepté.
+    retry = _NotificationRetry(
+        total=2,
+        connect=2,
+        read=0,
+        status=2,
+        backoff_factor=0.3,
+        status_forcelist=(429,),
+        allowed_methods=frozenset({'GET', 'POST'}),
+        respect_retry_after_header=True,
+    )
+    session.mount('https://', HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=8))
+    return session
+
+# Connexions réutilisées entre envois: évite un handshake TCP+TLS par notification
+http_session = _create_http_session()
+
+# Délai max par appel HTTP / par canal testé (secondes)
+API_CHECK_TIMEOUT = float(os.getenv('API_CHECK_TIMEOUT', '10.0'))
+
 class NotificationLevel(Enum):
     """Niveaux de notification"""
     DEBUG = 1
@@ -86,6 +127,10 @@ class NotificationProvider(ABC):
     def is_available(self) -> bool:
         """Vérifie si le fournisseur est disponible"""
         pass
+    
+    async def check(self) -> bool:
+        """Vérifie le canal sans envoyer de message"""
+        return self.is_available()
 
 class EmailProvider(NotificationProvider):
     """Fournisseur de notifications par email"""
@@ -223,8 +268,8 @@ class TelegramProvider(NotificationProvider):
                 'disable_web_page_preview': True
             }
             
-            async with asyncio.timeout(10):
-                response = requests.post(url, json=payload)
+            async with asyncio.timeout(API_CHECK_TIMEOUT):
+                response = await asyncio.to_thread(http_session.post, url, json=payload, timeout=API_CHECK_TIMEOUT)
                 response.raise_for_status()
             
             logger.info(f"📱 Telegram envoyé: {message.title}")
@@ -234,6 +279,22 @@ class TelegramProvider(NotificationProvider):
             logger.error(f"❌ Erreur envoi Telegram: {e}")
             return False
     
+    async def check(self) -> bool:
+        """Vérifie le token via getMe, sans écrire dans le chat"""
+        try:
+            if not self.is_available():
+                return False
+            
+            async with asyncio.timeout(API_CHECK_TIMEOUT):
+                response = await asyncio.to_thread(http_session.get, f"{self.api_url}/getMe", timeout=API_CHECK_TIMEOUT)
+                response.raise_for_status()
+            
+            return bool(response.json().get('ok'))
+            
+        except Exception as e:
+            logger.error(f"❌ Erreur vérification Telegram: {e}")
+            return False
+    
     def is_available(self) -> bool:
         """Vérifie si Telegram est configuré"""
         return bool(self.bot_token and self.chat_id)
@@ -300,8 +361,9 @@ class DiscordProvider(NotificationProvider):
                 'avatar_url': 'https://via.placeholder.com/128/667eea/ffffff?text=🤖'
             }
             
-            async with asyncio.timeout(10):
-                response = requests.post(self.webhook_url, json=payload)
+            async with asyncio.timeout(API_CHECK_TIMEOUT):
+                response = await asyncio.to_thread(http_session.post, self.webhook_url, json=payload,
+                                                 timeout=API_CHECK_TIMEOUT)
                 response.raise_for_status()
             
             logger.info(f"🎮 Discord envoyé: {message.title}")
@@ -378,15 +440,11 @@ class WebhookProvider(NotificationProvider):
                 'priority': message.priority
             }
             
-            success_count = 0
-            for webhook_url in self.webhook_urls:
-                try:
-                    async with asyncio.timeout(10):
-                        response = requests.post(webhook_url, json=payload)
-                        if response.status_code == 200:
-                            success_count += 1
-                except Exception as e:
-                    logger.warning(f"⚠️ Erreur webhook {webhook_url}: {e}")
+            # Webhooks indépendants: envois en parallèle
+            results = await asyncio.gather(*(
+                self._post(webhook_url, payload) for webhook_url in self.webhook_urls
+            ))
+            success_count = sum(results)
             
             if success_count > 0:
                 logger.info(f"🔗 Webhook envoyé: {success_count}/{len(self.webhook_urls)}")
@@ -398,6 +456,17 @@ class WebhookProvider(NotificationProvider):
             logger.error(f"❌ Erreur envoi webhook: {e}")
             return False
     
+    async def _post(self, webhook_url: str, payload: Dict) -> bool:
+        """Envoi vers un webhook, hors de la boucle d'événements"""
+        try:
+            async with asyncio.timeout(API_CHECK_TIMEOUT):
+                response = await asyncio.to_thread(http_session.post, webhook_url, json=payload,
+                                                 timeout=API_CHECK_TIMEOUT)
+                return response.status_code == 200
+        except Exception as e:
+            logger.warning(f"⚠️ Erreur webhook {webhook_url}: {e}")
+            return False
+    
     def is_available(self) -> bool:
         """Vérifie si des webhooks sont configurés"""
         return len(self.webhook_urls) > 0
@@ -626,18 +695,24 @@ class IntelligentNotificationManager:
     async def _send_message(self, message: NotificationMessage):
         """Envoie un message via tous les canaux configurés"""
         try:
-            success_count = 0
+            channels = [
+                channel for channel in message.channels
+                if channel in self.providers and self.providers[channel].is_available()
+            ]
+            
+            # Canaux indépendants: envois en parallèle
+            results = await asyncio.gather(
+                *(self.providers[channel].send(message) for channel in channels),
+                return_exceptions=True
+            )
             
-            for channel in message.channels:
-                provider = self.providers.get(channel)
-                if provider and provider.is_available():
-                    try:
-                        success = await provider.send(message)
-                        if success:
-                            message.sent_channels.append(channel)
-                            success_count += 1
-                    except Exception as e:
-                        logger.error(f"❌ Erreur envoi {channel.value}: {e}")
+            success_count = 0
+            for channel, success in zip(channels, results):
+                if isinstance(success, Exception):
+                    logger.error(f"❌ Erreur envoi {channel.value}: {success}")
+                elif success:
+                    message.sent_channels.append(channel)
+                    success_count += 1
             
             # Mise à jour du statut
             message.is_sent = success_count > 0
@@ -890,8 +965,6 @@ class IntelligentNotificationManager:
     
     async def send_test_notifications(self) -> Dict:
         """Envoie des notifications de test"""
-        results = {}
-        
         test_message = NotificationMessage(
             id="test_notification",
             type=NotificationType.SYSTEM_STATUS,
@@ -902,17 +975,37 @@ class IntelligentNotificationManager:
             timestamp=datetime.now(),
             channels=list(self.providers.keys())
         )
+        return await self._test_channels(lambda provider: provider.send(test_message))
+    
+    async def check_channels(self) -> Dict:
+        """Vérifie les canaux configurés sans envoyer de message (authentification seule)"""
+        return await self._test_channels(lambda provider: provider.check())
+    
+    async def _test_channels(self, run_test) -> Dict:
+        """Test concurrent de chaque canal disponible, borné par API_CHECK_TIMEOUT"""
+        results = {}
         
+        available = []
         for channel, provider in self.providers.items():
             if provider.is_available():
-                try:
-                    success = await provider.send(test_message)
-                    results[channel.value] = 'success' if success else 'failed'
-                except Exception as e:
-                    results[channel.value] = f'error: {str(e)}'
+                available.append(channel)
             else:
                 results[channel.value] = 'not_configured'
         
+        # Tests indépendants: durée totale = canal le plus lent
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(run_test(self.providers[channel]), API_CHECK_TIMEOUT)
+              for channel in available),
+            return_exceptions=True
+        )
+        for channel, outcome in zip(available, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                results[channel.value] = f'⏱ Timeout après {API_CHECK_TIMEOUT}s'
+            elif isinstance(outcome, Exception):
+                results[channel.value] = f'error: {str(outcome)}'
+            else:
+                results[channel.value] = 'success' if outcome else 'failed'
+        
         return results
 
 # Instance globale
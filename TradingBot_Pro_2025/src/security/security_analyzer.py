@@ -9,6 +9,7 @@ import requests
 import re
 import os
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Any
 import pkg_resources
 import importlib.metadata
@@ -507,8 +508,8 @@ class SecurityAnalyzer:
         }
         
         # Sauvegarder le rapport
-        with open('security_audit_report.json', 'w') as f:
-            json.dump(report, f, indent=2, default=str)
+        report_json = json.dumps(report, indent=2, default=str)
+        Path('security_audit_report.json').write_text(report_json, encoding='utf-8')
         
         self.print_security_report(report)
         return report
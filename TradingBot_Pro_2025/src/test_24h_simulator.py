@@ -14,6 +14,7 @@ import numpy as np
 from dataclasses import dataclass, asdict
 import threading
 from collections import defaultdict
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
@@ -512,8 +513,9 @@ class Test24HSimulator:
         # Sauvegarder le rapport final
         final_report = self.generate_final_report()
         
-        with open(f'test_24h_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json', 'w') as f:
-            json.dump(final_report, f, indent=2, default=str)
+        # Sérialisé en mémoire puis écrit en une fois: pas de rapport tronqué si la sérialisation échoue
+        report_json = json.dumps(final_report, indent=2, default=str)
+        Path(f'test_24h_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json').write_text(report_json, encoding='utf-8')
         
         logger.info(f"📊 Rapport final sauvegardé")
     
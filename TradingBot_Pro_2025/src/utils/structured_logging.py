@@ -5,7 +5,14 @@ Logs ultra-professionnels pour analyse avancée
 
 import json
 import logging
+import logging.handlers
+import functools
+import atexit
+import math
+import threading
+import zlib
 import structlog
+from queue import Queue
 from datetime import datetime
 import traceback
 import uuid
@@ -13,6 +20,70 @@ from typing import Dict, Any, Optional
 import os
 from pathlib import Path
 
+# Nombre de fichiers trading_N.json (un writer indépendant par shard)
+TRADING_SHARDS = 8
+
+# Logs à fort débit écrits par lots (un flush disque tous les N enregistrements).
+# Les trades n'en font pas partie: un crash ne doit perdre aucune exécution.
+BUFFERED_LOGS = ('main', 'api', 'ai', 'performance')
+LOG_BUFFER_RECORDS = 100
+
+# Writers partagés par toutes les instances: handlers attachés une seule fois par processus
+_writers_lock = threading.Lock()
+_buffers: list = []
+_listeners: list = []
+_trading_shards: list = []
+
+# Piles d'appels déjà rendues, indexées par chaîne de frames (site de levée)
+_stack_cache: Dict[tuple, str] = {}
+_STACK_CACHE_SIZE = 256
+
+def _format_traceback(error: Exception) -> str:
+    """Rendu du traceback d'une exception sans relire la pile courante"""
+    if error.__cause__ is not None or error.__context__ is not None:
+        # Exceptions chaînées : rendu complet, non mis en cache
+        return "".join(traceback.format_exception(type(error), error, error.__traceback__))
+    
+    frames = []
+    tb = error.__traceback__
+    while tb is not None:
+        frames.append((tb.tb_frame.f_code, tb.tb_lasti))
+        tb = tb.tb_next
+    key = tuple(frames)
+    
+    stack = _stack_cache.get(key)
+    if stack is None:
+        stack = "".join(traceback.StackSummary.extract(
+            traceback.walk_tb(error.__traceback__), capture_locals=False
+        ).format())
+        if len(_stack_cache) >= _STACK_CACHE_SIZE:
+            _stack_cache.clear()
+        _stack_cache[key] = stack
+    
+    rendered = "".join(traceback.format_exception_only(type(error), error))
+    if not frames:
+        return rendered
+    return "Traceback (most recent call last):\n" + stack + rendered
+
+def _stop_trading_shards():
+    """Arrêt des listeners de shards et détachement de leurs QueueHandler"""
+    with _writers_lock:
+        for listener in _listeners:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+        _listeners.clear()
+        for shard in range(TRADING_SHARDS):
+            logger = logging.getLogger(f"tradingbot.trading.{shard}")
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+        _trading_shards.clear()
+
+@functools.lru_cache(maxsize=1024)
+def get_api_call_logger(endpoint: str, method: str):
+    """Logger API pré-lié à un endpoint et une méthode (mis en cache)"""
+    return structlog.get_logger("tradingbot.api").bind(endpoint=endpoint, method=method)
+
 class JSONStructuredLogger:
     """Système de logs structurés en JSON ultra-avancé"""
     
@@ -20,9 +91,13 @@ class JSONStructuredLogger:
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
         
+        # Statistiques courantes par métrique : (count, mean, m2) - algorithme de Welford
+        self.metric_stats: Dict[str, tuple] = {}
+        
         # Configuration structlog
         structlog.configure(
             processors=[
+                structlog.contextvars.merge_contextvars,
                 structlog.stdlib.filter_by_level,
                 structlog.stdlib.add_logger_name,
                 structlog.stdlib.add_log_level,
@@ -66,6 +141,7 @@ class JSONStructuredLogger:
         # Configuration des fichiers de logs
         log_files = {
             'main': self.log_dir / 'main.json',
+            # Les trades vont dans trading_N.json, lus avec trading.json par get_log_analytics
             'trading': self.log_dir / 'trading.json',
             'api': self.log_dir / 'api.json',
             'ai': self.log_dir / 'ai.json',
@@ -74,14 +150,74 @@ class JSONStructuredLogger:
             'errors': self.log_dir / 'errors.json'
         }
         
-        # Setup handlers pour chaque logger
-        for log_name, log_file in log_files.items():
-            handler = logging.FileHandler(log_file)
-            handler.setFormatter(logging.Formatter('%(message)s'))
+        # Setup handlers pour chaque logger (déjà équipé par une autre instance: réutilisé tel quel)
+        with _writers_lock:
+            for log_name, log_file in log_files.items():
+                logger = logging.getLogger(f"tradingbot.{log_name}")
+                logger.setLevel(logging.INFO)
+                if logger.handlers:
+                    continue
+                
+                handler = logging.FileHandler(log_file)
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                if log_name in BUFFERED_LOGS:
+                    handler = self._buffered(handler)
+                logger.addHandler(handler)
+    
+    def _buffered(self, handler: logging.Handler) -> logging.Handler:
+        """Regroupe les écritures d'un handler fichier (flush immédiat sur erreur)"""
+        buffered = logging.handlers.MemoryHandler(
+            LOG_BUFFER_RECORDS, flushLevel=logging.ERROR, target=handler
+        )
+        _buffers.append(buffered)
+        return buffered
+    
+    def _start_trading_shards(self):
+        """Shards du log trading : symbole -> trading_N.json via QueueHandler + listener (au premier trade)"""
+        with _writers_lock:
+            if _trading_shards:
+                return
+            
+            for shard in range(TRADING_SHARDS):
+                shard_name = f"tradingbot.trading.{shard}"
+                logger = logging.getLogger(shard_name)
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                
+                if not logger.handlers:
+                    # Pas de MemoryHandler: le listener écrit chaque trade dès qu'il le dépile
+                    handler = logging.FileHandler(self.log_dir / f'trading_{shard}.json')
+                    handler.setFormatter(logging.Formatter('%(message)s'))
+                    
+                    queue = Queue(-1)
+                    listener = logging.handlers.QueueListener(queue, handler)
+                    listener.start()
+                    _listeners.append(listener)
+                    logger.addHandler(logging.handlers.QueueHandler(queue))
+                
+                _trading_shards.append(structlog.get_logger(shard_name))
             
-            logger = logging.getLogger(f"tradingbot.{log_name}")
-            logger.addHandler(handler)
-            logger.setLevel(logging.INFO)
+            atexit.unregister(_stop_trading_shards)
+            atexit.register(_stop_trading_shards)
+    
+    def flush(self):
+        """Écriture sur disque des enregistrements en attente (files des shards comprises)"""
+        # Attendre que chaque writer de shard ait traité sa file avant de vider les tampons
+        for listener in _listeners:
+            listener.queue.join()
+        for buffered in _buffers:
+            buffered.flush()
+    
+    def close(self):
+        """Arrêt des writers de shards (vide les files en attente, relancés au trade suivant)"""
+        _stop_trading_shards()
+        self.flush()
+    
+    def _trading_shard(self, symbol: Optional[str]):
+        """Logger du shard trading associé à un symbole"""
+        if not _trading_shards:
+            self._start_trading_shards()
+        return _trading_shards[zlib.crc32(str(symbol).encode()) % TRADING_SHARDS]
     
     def log_trade(self, trade_data: Dict[str, Any]):
         """Méthode de compatibilité pour log_trade"""
@@ -100,20 +236,28 @@ class JSONStructuredLogger:
         self.log_ai_prediction(symbol, prediction, model_version)
     
     def log_trade_execution(self, trade_data: Dict[str, Any], success: bool, pnl: float):
-        """Log d'exécution de trade structuré"""
-        self.trading_logger.info(
+        """Log d'exécution de trade structuré (trading_N.json; trading.json garde les autres événements trading)"""
+        symbol = trade_data.get('symbol')
+        
+        # Stratégie explicite prioritaire, sinon celle liée par bind_strategy_context
+        context = {}
+        if 'strategy' in trade_data:
+            context['strategy'] = trade_data['strategy']
+        elif 'strategy' not in structlog.contextvars.get_contextvars():
+            context['strategy'] = 'ai'
+        
+        self._trading_shard(symbol).info(
             "trade_executed",
             trade_id=str(uuid.uuid4()),
-            symbol=trade_data.get('symbol'),
+            symbol=symbol,
             side=trade_data.get('side'),
             amount=trade_data.get('amount'),
             price=trade_data.get('price'),
             success=success,
             pnl=pnl,
-            timestamp=datetime.now().isoformat(),
-            strategy=trade_data.get('strategy', 'ai'),
             confidence=trade_data.get('confidence', 0),
-            execution_time_ms=trade_data.get('execution_time', 0)
+            execution_time_ms=trade_data.get('execution_time', 0),
+            **context
         )
     
     def log_ai_prediction(self, symbol: str, prediction: Dict[str, Any], model_version: str):
@@ -124,25 +268,28 @@ class JSONStructuredLogger:
             symbol=symbol,
             prediction=prediction,
             model_version=model_version,
-            timestamp=datetime.now().isoformat(),
             confidence_score=prediction.get('confidence', 0),
             recommendation=prediction.get('action', 'hold')
         )
     
     def log_api_call(self, endpoint: str, method: str, status_code: int, response_time_ms: float, data_size: int = 0):
         """Log d'appel API structuré"""
-        self.api_logger.info(
+        get_api_call_logger(endpoint, method).info(
             "api_call",
             call_id=str(uuid.uuid4()),
-            endpoint=endpoint,
-            method=method,
             status_code=status_code,
             response_time_ms=response_time_ms,
             data_size_bytes=data_size,
-            timestamp=datetime.now().isoformat(),
             success=status_code < 400
         )
     
+    def log_strategy_event(self, event: str, data: Dict[str, Any] = None):
+        """Log d'événement de stratégie (contexte lié via bind_strategy_context)"""
+        if data:
+            self.main_logger.info(event, **data)
+        else:
+            self.main_logger.info(event)
+    
     def log_security_event(self, event_type: str, severity: str, details: Dict[str, Any]):
         """Log d'événement de sécurité"""
         self.security_logger.warning(
@@ -158,6 +305,13 @@ class JSONStructuredLogger:
     
     def log_performance_metric(self, metric_name: str, value: float, unit: str, context: Dict[str, Any] = None):
         """Log de métrique de performance"""
+        count, mean, m2 = self.metric_stats.get(metric_name, (0, 0.0, 0.0))
+        count += 1
+        delta = value - mean
+        mean += delta / count
+        m2 += delta * (value - mean)
+        self.metric_stats[metric_name] = (count, mean, m2)
+        
         self.performance_logger.info(
             "performance_metric",
             metric_id=str(uuid.uuid4()),
@@ -168,24 +322,40 @@ class JSONStructuredLogger:
             timestamp=datetime.now().isoformat()
         )
     
+    def get_metric_average(self, metric_name: str) -> float:
+        """Moyenne courante d'une métrique en O(1)"""
+        return self.metric_stats.get(metric_name, (0, 0.0, 0.0))[1]
+    
+    def get_metric_std(self, metric_name: str) -> float:
+        """Écart-type (échantillon) courant d'une métrique en O(1)"""
+        count, _, m2 = self.metric_stats.get(metric_name, (0, 0.0, 0.0))
+        return math.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+    
     def log_error(self, error: Exception, context: Dict[str, Any] = None):
         """Log d'erreur structuré"""
+        if not logging.getLogger("tradingbot.errors").isEnabledFor(logging.ERROR):
+            return
+        
         error_logger = structlog.get_logger("tradingbot.errors")
         error_logger.error(
             "error_occurred",
             error_id=str(uuid.uuid4()),
             error_type=type(error).__name__,
             error_message=str(error),
-            traceback=traceback.format_exc(),
+            traceback=_format_traceback(error),
             context=context or {},
             timestamp=datetime.now().isoformat()
         )
     
     def get_log_analytics(self, log_type: str = "trading", hours: int = 24) -> Dict[str, Any]:
         """Analyse des logs pour insights"""
-        log_file = self.log_dir / f"{log_type}.json"
+        self.flush()
+        log_files = [self.log_dir / f"{log_type}.json"]
+        if log_type == "trading":
+            log_files += sorted(self.log_dir.glob("trading_*.json"))
+        log_files = [log_file for log_file in log_files if log_file.exists()]
         
-        if not log_file.exists():
+        if not log_files:
             return {"error": f"Log file {log_type}.json not found"}
         
         analytics = {
@@ -198,32 +368,33 @@ class JSONStructuredLogger:
         }
         
         try:
-            with open(log_file, 'r') as f:
-                entries = []
-                for line in f:
-                    try:
-                        entry = json.loads(line)
-                        entries.append(entry)
-                    except json.JSONDecodeError:
-                        continue
-                
-                analytics["total_entries"] = len(entries)
-                
-                if log_type == "trading":
-                    successful_trades = sum(1 for e in entries if e.get('success', False))
-                    analytics["success_rate"] = (successful_trades / len(entries) * 100) if entries else 0
-                    
-                    # Top symbols
-                    symbols = {}
-                    for entry in entries:
-                        symbol = entry.get('symbol', 'unknown')
-                        symbols[symbol] = symbols.get(symbol, 0) + 1
-                    analytics["top_symbols"] = dict(sorted(symbols.items(), key=lambda x: x[1], reverse=True)[:5])
+            entries = []
+            for log_file in log_files:
+                with open(log_file, 'r') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                            entries.append(entry)
+                        except json.JSONDecodeError:
+                            continue
+            
+            analytics["total_entries"] = len(entries)
+            
+            if log_type == "trading":
+                successful_trades = sum(1 for e in entries if e.get('success', False))
+                analytics["success_rate"] = (successful_trades / len(entries) * 100) if entries else 0
                 
-                elif log_type == "api":
-                    response_times = [e.get('response_time_ms', 0) for e in entries if 'response_time_ms' in e]
-                    analytics["avg_response_time"] = sum(response_times) / len(response_times) if response_times else 0
-                    analytics["error_count"] = sum(1 for e in entries if e.get('status_code', 200) >= 400)
+                # Top symbols
+                symbols = {}
+                for entry in entries:
+                    symbol = entry.get('symbol', 'unknown')
+                    symbols[symbol] = symbols.get(symbol, 0) + 1
+                analytics["top_symbols"] = dict(sorted(symbols.items(), key=lambda x: x[1], reverse=True)[:5])
+            
+            elif log_type == "api":
+                response_times = [e.get('response_time_ms', 0) for e in entries if 'response_time_ms' in e]
+                analytics["avg_response_time"] = sum(response_times) / len(response_times) if response_times else 0
+                analytics["error_count"] = sum(1 for e in entries if e.get('status_code', 200) >= 400)
         
         except Exception as e:
             analytics["error"] = f"Analysis failed: {str(e)}"
@@ -237,6 +408,20 @@ structured_logger = JSONStructuredLogger()
 StructuredLogger = JSONStructuredLogger
 
 # Fonctions utilitaires
+def bind_strategy_context(strategy_name: str, run_id: Optional[str] = None) -> str:
+    """Lie la stratégie courante à tous les logs du contexte (thread/tâche)"""
+    run_id = run_id or str(uuid.uuid4())
+    structlog.contextvars.bind_contextvars(strategy=strategy_name, run_id=run_id)
+    return run_id
+
+def clear_strategy_context():
+    """Retire le contexte de stratégie lié par bind_strategy_context"""
+    structlog.contextvars.unbind_contextvars('strategy', 'run_id')
+
+def log_strategy_event(event: str, data: Dict[str, Any] = None):
+    """Log d'événement de stratégie simplifié"""
+    structured_logger.log_strategy_event(event, data)
+
 def log_trade(trade_data: Dict[str, Any], success: bool, pnl: float):
     """Log de trade simplifié"""
     structured_logger.log_trade_execution(trade_data, success, pnl)
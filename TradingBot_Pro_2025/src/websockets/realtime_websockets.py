@@ -11,15 +11,21 @@
 - Notifications trading instantanées  
 - Dashboard live avec métriques
 - Gestion connexions optimisée
+
+📦 Trames regroupées: un client lent peut recevoir plusieurs messages diffusés
+dans une seule trame {"type": "batch", "messages": [...]}, chaque élément
+ayant la forme habituelle {"type", "channel", "data", "timestamp"}.
 """
 
 import asyncio
+import sys
 import websockets
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
 import json
 import logging
 import time
-import gzip
-import base64
+import random
+import numpy as np
 from typing import Dict, List, Set, Optional, Any, Callable
 from dataclasses import dataclass, field
 from enum import Enum
@@ -30,10 +36,70 @@ import ssl
 import jwt
 from cryptography.fernet import Fernet
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
 # Configuration logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("WebSocketsRealTime")
 
+# Sérialisation JSON : orjson (C) si disponible, sinon module json standard.
+# Les trames restent textuelles (str) pour ne pas changer le protocole client.
+if ORJSON_AVAILABLE:
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+    _loads = orjson.loads
+else:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# Format binaire MessagePack négocié via le sous-protocole "msgpack"
+if MSGSPEC_AVAILABLE:
+    class WSMessageOut(msgspec.Struct):
+        """Trame diffusée (même structure que le message JSON)"""
+        type: str
+        channel: str
+        data: Dict[str, Any]
+        timestamp: str
+
+    _MSGPACK_ENCODER = msgspec.msgpack.Encoder()
+    _MSGPACK_DECODER = msgspec.msgpack.Decoder()
+    SUBPROTOCOLS = ["msgpack", "json"]
+    _DECODE_ERRORS = (json.JSONDecodeError, msgspec.DecodeError)
+else:
+    SUBPROTOCOLS = ["json"]
+    _DECODE_ERRORS = (json.JSONDecodeError,)
+
+def _encode(obj: Dict[str, Any], binary: bool = False):
+    """Encode un message selon le format négocié par le client"""
+    if binary:
+        return _MSGPACK_ENCODER.encode(obj)
+    return _dumps(obj)
+
+def _encode_batch(payloads: List[Any], binary: bool = False):
+    """Regroupe des messages déjà encodés dans une trame {"type": "batch", "messages": [...]}"""
+    if binary:
+        return _MSGPACK_ENCODER.encode({
+            'type': MessageType.BATCH.value,
+            'messages': [msgspec.Raw(payload) for payload in payloads]
+        })
+    return '{"type":"batch","messages":[' + ','.join(payloads) + ']}'
+
 class MessageType(Enum):
     """Types de messages WebSocket"""
     PRICE_UPDATE = "price_update"
@@ -47,6 +113,7 @@ class MessageType(Enum):
     SUBSCRIBE = "subscribe"
     UNSUBSCRIBE = "unsubscribe"
     ERROR = "error"
+    BATCH = "batch"  # {"type": "batch", "messages": [message, ...]} : messages diffusés regroupés
 
 class ChannelType(Enum):
     """Canaux de données disponibles"""
@@ -57,7 +124,67 @@ class ChannelType(Enum):
     ALERTS = "alerts"
     ANALYTICS = "analytics"
 
-@dataclass
+# Index entier de chaque canal : abonnés et générateurs sont stockés dans des listes
+_CHANNEL_INDEX = {channel: index for index, channel in enumerate(ChannelType)}
+
+TIMESTAMP_REFRESH_INTERVAL = 0.25
+
+class _TimestampCache:
+    """Horodatage ISO partagé, rafraîchi périodiquement (pas de formatage par message)"""
+    __slots__ = ('_iso', '_expires')
+    
+    def __init__(self):
+        self.refresh()
+    
+    def refresh(self):
+        """Reformate l'horodatage, valable TIMESTAMP_REFRESH_INTERVAL secondes"""
+        self._iso = datetime.now().isoformat()
+        self._expires = time.monotonic() + TIMESTAMP_REFRESH_INTERVAL
+    
+    @property
+    def iso(self) -> str:
+        # Sans _refresh_timestamp (streamer utilisé hors start_server), la lecture rafraîchit elle-même
+        if time.monotonic() >= self._expires:
+            self.refresh()
+        return self._iso
+
+_TS = _TimestampCache()
+
+async def _refresh_timestamp():
+    """Met à jour l'horodatage partagé toutes les TIMESTAMP_REFRESH_INTERVAL secondes"""
+    while True:
+        _TS.refresh()
+        await asyncio.sleep(TIMESTAMP_REFRESH_INTERVAL)
+
+# Recherche O(1) des types de messages reçus
+_TYPE_MAP = {message_type.value: message_type for message_type in MessageType}
+_CHANNEL_MAP = {channel.value: channel for channel in ChannelType}
+
+# Constantes des générateurs simulés
+_SYMBOLS = ('BTC/USD', 'ETH/USD', 'ADA/USD', 'DOT/USD', 'LINK/USD')
+_MAJOR_SYMBOLS = ('BTC/USD', 'ETH/USD', 'ADA/USD')
+_TRADE_SIDES = ('buy', 'sell')
+_TRADE_STATUSES = ('executed', 'pending', 'partial')
+_SYSTEM_STATUSES = ('healthy', 'warning', 'error')
+_ALERT_LEVELS = ('info', 'warning', 'critical')
+_ALERT_MESSAGES = (
+    "🚨 Prix BTC franchit résistance à 45000 USD",
+    "📈 Signal d'achat détecté sur ETH/USD",
+    "⚠️ Volatilité élevée détectée",
+    "💰 Objectif de profit atteint sur position ADA",
+    "🔔 Nouvelle opportunité d'arbitrage disponible"
+)
+
+# Messages diffusés en attente par client avant désabonnement (client trop lent)
+CLIENT_SEND_QUEUE_SIZE = 256
+
+# Fenêtre de regroupement des messages d'un client en une seule trame (secondes)
+COALESCE_WINDOW = 0.005
+
+# Tampon d'écriture au-delà duquel un client passe par sa file au lieu de websockets.broadcast
+BROADCAST_WRITE_BUFFER_LIMIT = 64 * 1024
+
+@dataclass(slots=True)
 class WebSocketMessage:
     """Message WebSocket structuré"""
     type: MessageType
@@ -67,9 +194,9 @@ class WebSocketMessage:
     user_id: Optional[str] = None
     compressed: bool = False
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class ClientConnection:
-    """Connexion client avec métadonnées"""
+    """Connexion client avec métadonnées (hachée par identité pour les sets d'abonnés)"""
     websocket: websockets.WebSocketServerProtocol
     user_id: Optional[str] = None
     subscriptions: Set[ChannelType] = field(default_factory=set)
@@ -78,6 +205,15 @@ class ClientConnection:
     last_ping: datetime = field(default_factory=datetime.now)
     ip_address: str = ""
     user_agent: str = ""
+    binary: bool = False  # Sous-protocole msgpack négocié
+    send_queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=CLIENT_SEND_QUEUE_SIZE))
+    writer_task: Optional[asyncio.Task] = None
+    idle: bool = True  # Aucune trame en cours d'envoi par la tâche dédiée
+    client_id: int = -1  # Emplacement dans WebSocketRealTimeServer.clients
+
+# Cache des tokens vérifiés (évite un jwt.decode par reconnexion)
+TOKEN_CACHE_SIZE = 4096
+TOKEN_CACHE_TTL = 60
 
 class WebSocketAuthenticator:
     """Authentification WebSocket sécurisée"""
@@ -86,6 +222,8 @@ class WebSocketAuthenticator:
         self.secret_key = secret_key
         self.cipher = Fernet(Fernet.generate_key())
         self.valid_tokens: Dict[str, Dict] = {}
+        # Tokens déjà vérifiés : token -> (payload, valide jusqu'à)
+        self._verified_tokens: Dict[str, tuple] = {}
         
     def generate_token(self, user_id: str, permissions: List[str] = None) -> str:
         """Génère un token JWT sécurisé"""
@@ -109,12 +247,23 @@ class WebSocketAuthenticator:
     
     def verify_token(self, token: str) -> Optional[Dict]:
         """Vérifie et décode un token"""
+        now = time.time()
+        cached = self._verified_tokens.get(token) if isinstance(token, str) else None
+        if cached is not None:
+            payload, valid_until = cached
+            if now < valid_until and payload['user_id'] in self.valid_tokens:
+                return payload
+            del self._verified_tokens[token]
+        
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=['HS256'])
             
             # Vérifier que le token est encore valide
             if payload['user_id'] in self.valid_tokens:
                 logger.debug(f"✅ Token valide pour {payload['user_id']}")
+                if len(self._verified_tokens) >= TOKEN_CACHE_SIZE:
+                    self._verified_tokens.pop(next(iter(self._verified_tokens)))
+                self._verified_tokens[token] = (payload, min(now + TOKEN_CACHE_TTL, payload['exp']))
                 return payload
             else:
                 logger.warning(f"⚠️ Token non reconnu pour {payload.get('user_id', 'unknown')}")
@@ -127,124 +276,149 @@ class WebSocketAuthenticator:
             logger.warning(f"⚠️ Token invalide: {e}")
             return None
 
+# Nombre de ticks tirés d'avance par générateur (un appel NumPy par bloc)
+DRAW_BLOCK_SIZE = 256
+
 class RealTimeDataStreamer:
     """Générateur de données temps réel"""
     
     def __init__(self):
         self.running = False
-        self.subscribers: Dict[ChannelType, Set[ClientConnection]] = {
-            channel: set() for channel in ChannelType
-        }
-        self.data_generators: Dict[ChannelType, Callable] = {
-            ChannelType.PRICES: self._generate_price_data,
-            ChannelType.TRADES: self._generate_trade_data,
-            ChannelType.PORTFOLIO: self._generate_portfolio_data,
-            ChannelType.SYSTEM: self._generate_system_data,
-            ChannelType.ALERTS: self._generate_alert_data,
-            ChannelType.ANALYTICS: self._generate_analytics_data
-        }
-        
+        # Indexés par _CHANNEL_INDEX
+        self.subscribers: List[Set[ClientConnection]] = [set() for _ in ChannelType]
+        self.data_generators: List[Callable] = [None] * len(ChannelType)
+        self.data_generators[_CHANNEL_INDEX[ChannelType.PRICES]] = self._generate_price_data
+        self.data_generators[_CHANNEL_INDEX[ChannelType.TRADES]] = self._generate_trade_data
+        self.data_generators[_CHANNEL_INDEX[ChannelType.PORTFOLIO]] = self._generate_portfolio_data
+        self.data_generators[_CHANNEL_INDEX[ChannelType.SYSTEM]] = self._generate_system_data
+        self.data_generators[_CHANNEL_INDEX[ChannelType.ALERTS]] = self._generate_alert_data
+        self.data_generators[_CHANNEL_INDEX[ChannelType.ANALYTICS]] = self._generate_analytics_data
+        
+        # Générateurs aléatoires partagés (tirages numériques vectorisés)
+        self._rng = np.random.default_rng()
+        self._pyr = random.Random()
+        self._draws: Dict[str, List[List[float]]] = {}
+        
+    def _draw(self, name: str, low: List[float], high: List[float], decimals: Optional[int] = None) -> List[float]:
+        """Ligne suivante d'un bloc de tirages uniformes calculé en une fois"""
+        block = self._draws.get(name)
+        if not block:
+            values = self._rng.uniform(low, high, size=(DRAW_BLOCK_SIZE, len(low)))
+            if decimals is not None:
+                values = values.round(decimals)
+            block = self._draws[name] = values.tolist()
+        return block.pop()
+    
     def _generate_price_data(self) -> Dict[str, Any]:
         """Génère des données de prix simulées"""
-        import random
-        symbols = ['BTC/USD', 'ETH/USD', 'ADA/USD', 'DOT/USD', 'LINK/USD']
+        price, change, volume, bid, ask = self._draw(
+            'prices',
+            [100, -10, 1000000, 100, 100],
+            [50000, 10, 100000000, 50000, 50000],
+            decimals=2
+        )
         
         return {
-            'symbol': random.choice(symbols),
-            'price': round(random.uniform(100, 50000), 2),
-            'change_24h': round(random.uniform(-10, 10), 2),
-            'volume': round(random.uniform(1000000, 100000000), 2),
-            'bid': round(random.uniform(100, 50000), 2),
-            'ask': round(random.uniform(100, 50000), 2),
-            'timestamp': datetime.now().isoformat()
+            'symbol': self._pyr.choice(_SYMBOLS),
+            'price': price,
+            'change_24h': change,
+            'volume': volume,
+            'bid': bid,
+            'ask': ask,
+            'timestamp': _TS.iso
         }
     
     def _generate_trade_data(self) -> Dict[str, Any]:
         """Génère des données de trading simulées"""
-        import random
+        amount, price = self._draw('trades', [0.1, 100], [10, 50000])
         
         return {
-            'trade_id': f"trade_{int(time.time())}_{random.randint(1000, 9999)}",
-            'symbol': random.choice(['BTC/USD', 'ETH/USD', 'ADA/USD']),
-            'side': random.choice(['buy', 'sell']),
-            'amount': round(random.uniform(0.1, 10), 4),
-            'price': round(random.uniform(100, 50000), 2),
-            'status': random.choice(['executed', 'pending', 'partial']),
-            'timestamp': datetime.now().isoformat()
+            'trade_id': f"trade_{int(time.time())}_{self._pyr.randint(1000, 9999)}",
+            'symbol': self._pyr.choice(_MAJOR_SYMBOLS),
+            'side': self._pyr.choice(_TRADE_SIDES),
+            'amount': round(amount, 4),
+            'price': round(price, 2),
+            'status': self._pyr.choice(_TRADE_STATUSES),
+            'timestamp': _TS.iso
         }
     
     def _generate_portfolio_data(self) -> Dict[str, Any]:
         """Génère des données de portefeuille simulées"""
-        import random
+        (total_value, total_pnl, total_pnl_pct,
+         btc_amount, btc_value, btc_pnl,
+         eth_amount, eth_value, eth_pnl) = self._draw(
+            'portfolio',
+            [10000, -1000, -10, 0.1, 5000, -500, 1, 2000, -300],
+            [100000, 5000, 25, 5, 25000, 2000, 50, 15000, 1500]
+        )
         
         return {
-            'total_value': round(random.uniform(10000, 100000), 2),
-            'total_pnl': round(random.uniform(-1000, 5000), 2),
-            'total_pnl_pct': round(random.uniform(-10, 25), 2),
+            'total_value': round(total_value, 2),
+            'total_pnl': round(total_pnl, 2),
+            'total_pnl_pct': round(total_pnl_pct, 2),
             'positions': [
                 {
                     'symbol': 'BTC/USD',
-                    'amount': round(random.uniform(0.1, 5), 4),
-                    'value': round(random.uniform(5000, 25000), 2),
-                    'pnl': round(random.uniform(-500, 2000), 2)
+                    'amount': round(btc_amount, 4),
+                    'value': round(btc_value, 2),
+                    'pnl': round(btc_pnl, 2)
                 },
                 {
                     'symbol': 'ETH/USD', 
-                    'amount': round(random.uniform(1, 50), 4),
-                    'value': round(random.uniform(2000, 15000), 2),
-                    'pnl': round(random.uniform(-300, 1500), 2)
+                    'amount': round(eth_amount, 4),
+                    'value': round(eth_value, 2),
+                    'pnl': round(eth_pnl, 2)
                 }
             ],
-            'timestamp': datetime.now().isoformat()
+            'timestamp': _TS.iso
         }
     
     def _generate_system_data(self) -> Dict[str, Any]:
         """Génère des données système"""
-        import random
+        cpu_usage, memory_usage, trades_per_second, latency_ms = self._draw(
+            'system',
+            [20, 30, 5, 10],
+            [80, 90, 50, 100],
+            decimals=1
+        )
         
         return {
-            'status': random.choice(['healthy', 'warning', 'error']),
-            'cpu_usage': round(random.uniform(20, 80), 1),
-            'memory_usage': round(random.uniform(30, 90), 1),
-            'active_connections': random.randint(50, 500),
-            'trades_per_second': round(random.uniform(5, 50), 1),
-            'latency_ms': round(random.uniform(10, 100), 1),
-            'timestamp': datetime.now().isoformat()
+            'status': self._pyr.choice(_SYSTEM_STATUSES),
+            'cpu_usage': cpu_usage,
+            'memory_usage': memory_usage,
+            'active_connections': self._pyr.randint(50, 500),
+            'trades_per_second': trades_per_second,
+            'latency_ms': latency_ms,
+            'timestamp': _TS.iso
         }
     
     def _generate_alert_data(self) -> Dict[str, Any]:
         """Génère des alertes simulées"""
-        import random
-        
-        alerts = [
-            "🚨 Prix BTC franchit résistance à 45000 USD",
-            "📈 Signal d'achat détecté sur ETH/USD",
-            "⚠️ Volatilité élevée détectée",
-            "💰 Objectif de profit atteint sur position ADA",
-            "🔔 Nouvelle opportunité d'arbitrage disponible"
-        ]
-        
         return {
             'id': f"alert_{int(time.time())}",
-            'level': random.choice(['info', 'warning', 'critical']),
-            'message': random.choice(alerts),
-            'symbol': random.choice(['BTC/USD', 'ETH/USD', 'ADA/USD']),
-            'timestamp': datetime.now().isoformat()
+            'level': self._pyr.choice(_ALERT_LEVELS),
+            'message': self._pyr.choice(_ALERT_MESSAGES),
+            'symbol': self._pyr.choice(_MAJOR_SYMBOLS),
+            'timestamp': _TS.iso
         }
     
     def _generate_analytics_data(self) -> Dict[str, Any]:
         """Génère des données analytiques"""
-        import random
+        performance_score, win_rate, avg_profit, max_drawdown, sharpe_ratio, profit_today = self._draw(
+            'analytics',
+            [70, 60, 50, 5, 1.5, -100],
+            [95, 85, 500, 20, 3.5, 1000]
+        )
         
         return {
-            'performance_score': round(random.uniform(70, 95), 1),
-            'win_rate': round(random.uniform(60, 85), 1),
-            'avg_profit': round(random.uniform(50, 500), 2),
-            'max_drawdown': round(random.uniform(5, 20), 2),
-            'sharpe_ratio': round(random.uniform(1.5, 3.5), 2),
-            'trades_today': random.randint(10, 100),
-            'profit_today': round(random.uniform(-100, 1000), 2),
-            'timestamp': datetime.now().isoformat()
+            'performance_score': round(performance_score, 1),
+            'win_rate': round(win_rate, 1),
+            'avg_profit': round(avg_profit, 2),
+            'max_drawdown': round(max_drawdown, 2),
+            'sharpe_ratio': round(sharpe_ratio, 2),
+            'trades_today': self._pyr.randint(10, 100),
+            'profit_today': round(profit_today, 2),
+            'timestamp': _TS.iso
         }
     
     async def start_streaming(self):
@@ -262,7 +436,7 @@ class RealTimeDataStreamer:
     
     async def _stream_channel_data(self, channel: ChannelType):
         """Streaming pour un canal spécifique"""
-        generator = self.data_generators.get(channel)
+        generator = self.data_generators[_CHANNEL_INDEX[channel]]
         if not generator:
             return
             
@@ -277,15 +451,22 @@ class RealTimeDataStreamer:
         }
         
         interval = intervals.get(channel, 5.0)
+        message_type = MessageType.PRICE_UPDATE if channel == ChannelType.PRICES else MessageType.NOTIFICATION
+        subscribers = self.subscribers[_CHANNEL_INDEX[channel]]
         
         while self.running:
             try:
+                # Aucun abonné : pas de génération ni de diffusion
+                if not subscribers:
+                    await asyncio.sleep(interval)
+                    continue
+                
                 # Générer données
                 data = generator()
                 
                 # Créer message
                 message = WebSocketMessage(
-                    type=MessageType.PRICE_UPDATE if channel == ChannelType.PRICES else MessageType.NOTIFICATION,
+                    type=message_type,
                     channel=channel,
                     data=data
                 )
@@ -302,47 +483,67 @@ class RealTimeDataStreamer:
     
     async def _broadcast_to_channel(self, channel: ChannelType, message: WebSocketMessage):
         """Diffuse un message à tous les abonnés d'un canal"""
-        subscribers = self.subscribers.get(channel, set())
+        subscribers = self.subscribers[_CHANNEL_INDEX[channel]]
         
         if not subscribers:
             return
             
-        # Préparer le message JSON
-        message_data = {
-            'type': message.type.value,
-            'channel': message.channel.value,
-            'data': message.data,
-            'timestamp': message.timestamp.isoformat()
-        }
-        
-        message_json = json.dumps(message_data)
-        
-        # Diffuser à tous les abonnés connectés
-        disconnected_clients = set()
-        
-        for client in subscribers:
+        # Clients encore connectés (les autres seront retirés)
+        live = [client for client in subscribers if client.websocket.open]
+        disconnected_clients = subscribers.difference(live)
+        
+        # Encodage unique par format (JSON texte / MessagePack binaire)
+        timestamp = _TS.iso
+        message_json = None
+        message_msgpack = None
+        if any(not client.binary for client in live):
+            message_json = _dumps({
+                'type': message.type.value,
+                'channel': message.channel.value,
+                'data': message.data,
+                'timestamp': timestamp
+            })
+        if any(client.binary for client in live):
+            message_msgpack = _MSGPACK_ENCODER.encode(WSMessageOut(
+                type=message.type.value,
+                channel=message.channel.value,
+                data=message.data,
+                timestamp=timestamp
+            ))
+        
+        # Clients inactifs : écriture directe via websockets.broadcast (sans await).
+        # Les autres passent par leur file pour conserver l'ordre des messages.
+        json_targets = []
+        msgpack_targets = []
+        for client in live:
+            if (client.idle and client.send_queue.empty()
+                    and client.websocket.transport.get_write_buffer_size() < BROADCAST_WRITE_BUFFER_LIMIT):
+                (msgpack_targets if client.binary else json_targets).append(client.websocket)
+                continue
             try:
-                if client.websocket.open:
-                    await client.websocket.send(message_json)
-                else:
-                    disconnected_clients.add(client)
-            except Exception as e:
-                logger.warning(f"⚠️ Erreur envoi à client: {e}")
+                client.send_queue.put_nowait(message_msgpack if client.binary else message_json)
+            except asyncio.QueueFull:
+                logger.warning(f"⚠️ Client trop lent, désabonné du canal {channel.value}")
+                client.subscriptions.discard(channel)
                 disconnected_clients.add(client)
         
+        if json_targets:
+            websockets.broadcast(json_targets, message_json)
+        if msgpack_targets:
+            websockets.broadcast(msgpack_targets, message_msgpack)
+        
         # Nettoyer les clients déconnectés
-        for client in disconnected_clients:
-            subscribers.discard(client)
+        subscribers.difference_update(disconnected_clients)
     
     def subscribe_client(self, client: ClientConnection, channel: ChannelType):
         """Abonne un client à un canal"""
-        self.subscribers[channel].add(client)
+        self.subscribers[_CHANNEL_INDEX[channel]].add(client)
         client.subscriptions.add(channel)
         logger.info(f"📡 Client {client.user_id or 'anonyme'} abonné au canal {channel.value}")
     
     def unsubscribe_client(self, client: ClientConnection, channel: ChannelType):
         """Désabonne un client d'un canal"""
-        self.subscribers[channel].discard(client)
+        self.subscribers[_CHANNEL_INDEX[channel]].discard(client)
         client.subscriptions.discard(channel)
         logger.info(f"📡 Client {client.user_id or 'anonyme'} désabonné du canal {channel.value}")
     
@@ -364,19 +565,104 @@ class WebSocketRealTimeServer:
         self.data_streamer = RealTimeDataStreamer()
         
         # Connexions actives
-        self.clients: Dict[str, ClientConnection] = {}
+        # Registre indexé par identifiant entier (emplacements libérés réutilisés)
+        self.clients: List[Optional[ClientConnection]] = []
+        self._free_ids: List[int] = []
         self.connection_count = 0
         
         # Serveur
         self.server = None
         self.running = False
+        self._timestamp_task: Optional[asyncio.Task] = None
+        
+        # Dispatch des messages reçus par type
+        self._handlers = {
+            MessageType.AUTH_REQUEST: self.handle_auth_request,
+            MessageType.SUBSCRIBE: self.handle_subscribe,
+            MessageType.UNSUBSCRIBE: self.handle_unsubscribe,
+            MessageType.HEARTBEAT: self.handle_heartbeat
+        }
+        
+        # Réponses fixes pré-construites ; seul l'horodatage varie
+        self._reply_templates: Dict[tuple, Dict[str, Any]] = {
+            (MessageType.HEARTBEAT, None): {
+                'type': MessageType.HEARTBEAT.value,
+                'channel': ChannelType.SYSTEM.value,
+                'data': {'status': 'alive', 'server_time': ''},
+                'timestamp': ''
+            }
+        }
+        for channel in ChannelType:
+            self._reply_templates[(MessageType.SUBSCRIBE, channel)] = {
+                'type': MessageType.SUBSCRIBE.value,
+                'channel': ChannelType.SYSTEM.value,
+                'data': {
+                    'subscribed': True,
+                    'channel': channel.value,
+                    'message': f'Abonné au canal {channel.value}'
+                },
+                'timestamp': ''
+            }
+            self._reply_templates[(MessageType.UNSUBSCRIBE, channel)] = {
+                'type': MessageType.UNSUBSCRIBE.value,
+                'channel': ChannelType.SYSTEM.value,
+                'data': {
+                    'unsubscribed': True,
+                    'channel': channel.value,
+                    'message': f'Désabonné du canal {channel.value}'
+                },
+                'timestamp': ''
+            }
+        self._encoded_replies: Dict[tuple, tuple] = {}
         
+        # Message de bienvenue : partie statique encodée une seule fois
+        self._welcome_data = {
+            'message': 'Bienvenue sur TradingBot Pro 2025 WebSocket',
+            'available_channels': [ch.value for ch in ChannelType],
+            'auth_required': True
+        }
+        self._welcome_prefix = _dumps({
+            'type': MessageType.SYSTEM_STATUS.value,
+            'channel': ChannelType.SYSTEM.value,
+            'data': self._welcome_data
+        })[:-2]  # sans les '}}' fermants
+        
+    def _welcome(self, client_id: int, binary: bool):
+        """Message de bienvenue : seuls client_id et l'horodatage sont ajoutés par connexion"""
+        timestamp = _TS.iso
+        if binary:
+            return _encode({
+                'type': MessageType.SYSTEM_STATUS.value,
+                'channel': ChannelType.SYSTEM.value,
+                'data': {**self._welcome_data, 'client_id': f"client_{client_id}", 'timestamp': timestamp},
+                'timestamp': timestamp
+            }, binary)
+        return (f'{self._welcome_prefix},"client_id":"client_{client_id}","timestamp":"{timestamp}"}},'
+                f'"timestamp":"{timestamp}"}}')
+    
+    def _fixed_reply(self, message_type: MessageType, channel: Optional[ChannelType], binary: bool):
+        """Réponse fixe encodée, réutilisée tant que l'horodatage partagé ne change pas"""
+        key = (message_type, channel, binary)
+        timestamp = _TS.iso
+        cached = self._encoded_replies.get(key)
+        if cached is not None and cached[0] == timestamp:
+            return cached[1]
+        
+        template = self._reply_templates[(message_type, channel)]
+        template['timestamp'] = timestamp
+        if message_type is MessageType.HEARTBEAT:
+            template['data']['server_time'] = timestamp
+        payload = _encode(template, binary)
+        self._encoded_replies[key] = (timestamp, payload)
+        return payload
+    
     async def start_server(self):
         """Démarre le serveur WebSocket"""
         try:
             logger.info(f"🚀 Démarrage serveur WebSocket sur {self.host}:{self.port}")
             
-            # Démarrer le streaming de données
+            # Horodatage partagé et streaming de données
+            self._timestamp_task = asyncio.create_task(_refresh_timestamp())
             asyncio.create_task(self.data_streamer.start_streaming())
             
             # Démarrer le serveur WebSocket
@@ -387,7 +673,16 @@ class WebSocketRealTimeServer:
                 ping_interval=20,
                 ping_timeout=10,
                 max_size=1024*1024,  # 1MB max message size
-                compression="deflate"
+                subprotocols=SUBPROTOCOLS,
+                compression=None,
+                extensions=[
+                    # Niveau zlib 3 : ~2x plus rapide que le niveau 6 par défaut sur du JSON répétitif
+                    ServerPerMessageDeflateFactory(
+                        server_max_window_bits=12,
+                        client_max_window_bits=12,
+                        compress_settings={'level': 3, 'memLevel': 5}
+                    )
+                ]
             )
             
             self.running = True
@@ -402,7 +697,7 @@ class WebSocketRealTimeServer:
     
     async def handle_client(self, websocket, path):
         """Gère une connexion client"""
-        client_id = f"client_{self.connection_count}"
+        client_id = self._free_ids.pop() if self._free_ids else len(self.clients)
         self.connection_count += 1
         
         # Informations client
@@ -412,65 +707,90 @@ class WebSocketRealTimeServer:
         client = ClientConnection(
             websocket=websocket,
             ip_address=ip_address,
-            user_agent=websocket.request_headers.get("User-Agent", "unknown")
+            user_agent=websocket.request_headers.get("User-Agent", "unknown"),
+            binary=websocket.subprotocol == "msgpack",
+            client_id=client_id
         )
         
-        self.clients[client_id] = client
+        if client_id == len(self.clients):
+            self.clients.append(client)
+        else:
+            self.clients[client_id] = client
+        client.writer_task = asyncio.create_task(self._client_writer(client))
         
-        logger.info(f"🔗 Nouvelle connexion: {client_id} depuis {ip_address}")
+        logger.info(f"🔗 Nouvelle connexion: client_{client_id} depuis {ip_address}")
         
         try:
             # Message de bienvenue
-            welcome_message = {
-                'type': MessageType.SYSTEM_STATUS.value,
-                'channel': ChannelType.SYSTEM.value,
-                'data': {
-                    'message': 'Bienvenue sur TradingBot Pro 2025 WebSocket',
-                    'client_id': client_id,
-                    'timestamp': datetime.now().isoformat(),
-                    'available_channels': [ch.value for ch in ChannelType],
-                    'auth_required': True
-                },
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            await websocket.send(json.dumps(welcome_message))
+            await websocket.send(self._welcome(client_id, client.binary))
             
             # Boucle de traitement des messages
             async for message in websocket:
                 await self.process_message(client, message)
                 
         except websockets.exceptions.ConnectionClosed:
-            logger.info(f"🔌 Connexion fermée: {client_id}")
+            logger.info(f"🔌 Connexion fermée: client_{client_id}")
         except Exception as e:
-            logger.error(f"❌ Erreur connexion {client_id}: {e}")
+            logger.error(f"❌ Erreur connexion client_{client_id}: {e}")
         finally:
             # Nettoyer la connexion
-            await self.cleanup_client(client_id)
+            await self.cleanup_client(client_id, client)
+    
+    async def _client_writer(self, client: ClientConnection):
+        """Envoie les messages diffusés en attente pour un client (regroupés par fenêtre)"""
+        queue = client.send_queue
+        try:
+            while True:
+                client.idle = True
+                payload = await queue.get()
+                client.idle = False
+                
+                # Laisser arriver les messages des autres canaux puis tout envoyer d'un coup
+                await asyncio.sleep(COALESCE_WINDOW)
+                if queue.empty():
+                    await client.websocket.send(payload)
+                    continue
+                
+                batch = [payload]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                await client.websocket.send(_encode_batch(batch, client.binary))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.warning(f"⚠️ Erreur envoi à client: {e}")
+            # Sans tâche d'envoi la connexion ne reçoit plus rien : la fermer
+            asyncio.create_task(client.websocket.close())
+        finally:
+            # Ne plus rien mettre en file pour ce client, quelle que soit la cause de l'arrêt
+            self._release_client(client)
     
     async def process_message(self, client: ClientConnection, message: str):
         """Traite un message reçu du client"""
         try:
-            data = json.loads(message)
-            message_type = MessageType(data.get('type', ''))
+            if client.binary and isinstance(message, bytes):
+                data = _MSGPACK_DECODER.decode(message)
+            else:
+                data = _loads(message)
+            try:
+                message_type = _TYPE_MAP.get(data.get('type', ''))
+            except TypeError:  # type non hachable (liste, objet...)
+                message_type = None
+            if message_type is None:
+                raise ValueError(f"{data.get('type')!r} is not a valid MessageType")
             
             # Mettre à jour le ping
             client.last_ping = datetime.now()
             
-            if message_type == MessageType.AUTH_REQUEST:
-                await self.handle_auth_request(client, data)
-            elif message_type == MessageType.SUBSCRIBE:
-                await self.handle_subscribe(client, data)
-            elif message_type == MessageType.UNSUBSCRIBE:
-                await self.handle_unsubscribe(client, data)
-            elif message_type == MessageType.HEARTBEAT:
-                await self.handle_heartbeat(client)
+            handler = self._handlers.get(message_type)
+            if handler:
+                await handler(client, data)
             else:
                 logger.warning(f"⚠️ Type de message non supporté: {message_type}")
                 
-        except json.JSONDecodeError:
-            logger.warning("⚠️ Message JSON invalide reçu")
-            await self.send_error(client, "Format JSON invalide")
+        except _DECODE_ERRORS:
+            logger.warning("⚠️ Message invalide reçu")
+            await self.send_error(client, "Format de message invalide")
         except ValueError as e:
             logger.warning(f"⚠️ Type de message invalide: {e}")
             await self.send_error(client, "Type de message non reconnu")
@@ -502,10 +822,10 @@ class WebSocketRealTimeServer:
                     'permissions': payload.get('permissions', []),
                     'message': 'Authentification réussie'
                 },
-                'timestamp': datetime.now().isoformat()
+                'timestamp': _TS.iso
             }
             
-            await client.websocket.send(json.dumps(response))
+            await client.websocket.send(_encode(response, client.binary))
             logger.info(f"✅ Client authentifié: {client.user_id}")
         else:
             await self.send_error(client, "Token invalide ou expiré")
@@ -518,63 +838,29 @@ class WebSocketRealTimeServer:
         
         channel_name = data.get('channel', '')
         
-        try:
-            channel = ChannelType(channel_name)
-            self.data_streamer.subscribe_client(client, channel)
-            
-            response = {
-                'type': MessageType.SUBSCRIBE.value,
-                'channel': ChannelType.SYSTEM.value,
-                'data': {
-                    'subscribed': True,
-                    'channel': channel.value,
-                    'message': f'Abonné au canal {channel.value}'
-                },
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            await client.websocket.send(json.dumps(response))
-            
-        except ValueError:
+        channel = _CHANNEL_MAP.get(channel_name)
+        if channel is None:
             await self.send_error(client, f"Canal invalide: {channel_name}")
+            return
+        
+        self.data_streamer.subscribe_client(client, channel)
+        await client.websocket.send(self._fixed_reply(MessageType.SUBSCRIBE, channel, client.binary))
     
     async def handle_unsubscribe(self, client: ClientConnection, data: Dict):
         """Gère un désabonnement d'un canal"""
         channel_name = data.get('channel', '')
         
-        try:
-            channel = ChannelType(channel_name)
-            self.data_streamer.unsubscribe_client(client, channel)
-            
-            response = {
-                'type': MessageType.UNSUBSCRIBE.value,
-                'channel': ChannelType.SYSTEM.value,
-                'data': {
-                    'unsubscribed': True,
-                    'channel': channel.value,
-                    'message': f'Désabonné du canal {channel.value}'
-                },
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            await client.websocket.send(json.dumps(response))
-            
-        except ValueError:
+        channel = _CHANNEL_MAP.get(channel_name)
+        if channel is None:
             await self.send_error(client, f"Canal invalide: {channel_name}")
+            return
+        
+        self.data_streamer.unsubscribe_client(client, channel)
+        await client.websocket.send(self._fixed_reply(MessageType.UNSUBSCRIBE, channel, client.binary))
     
-    async def handle_heartbeat(self, client: ClientConnection):
+    async def handle_heartbeat(self, client: ClientConnection, data: Dict = None):
         """Gère un heartbeat"""
-        response = {
-            'type': MessageType.HEARTBEAT.value,
-            'channel': ChannelType.SYSTEM.value,
-            'data': {
-                'status': 'alive',
-                'server_time': datetime.now().isoformat()
-            },
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        await client.websocket.send(json.dumps(response))
+        await client.websocket.send(self._fixed_reply(MessageType.HEARTBEAT, None, client.binary))
     
     async def send_error(self, client: ClientConnection, message: str):
         """Envoie un message d'erreur au client"""
@@ -585,28 +871,45 @@ class WebSocketRealTimeServer:
                 'error': True,
                 'message': message
             },
-            'timestamp': datetime.now().isoformat()
+            'timestamp': _TS.iso
         }
         
         try:
-            await client.websocket.send(json.dumps(error_message))
+            await client.websocket.send(_encode(error_message, client.binary))
         except Exception as e:
             logger.error(f"❌ Erreur envoi message d'erreur: {e}")
     
-    async def cleanup_client(self, client_id: str):
+    async def cleanup_client(self, client_id: int, client: Optional[ClientConnection] = None):
         """Nettoie les ressources d'un client déconnecté"""
-        client = self.clients.get(client_id)
+        if client is None:
+            client = self.clients[client_id] if client_id < len(self.clients) else None
         if not client:
             return
         
-        # Désabonner de tous les canaux
-        for channel in client.subscriptions.copy():
-            self.data_streamer.unsubscribe_client(client, channel)
-        
-        # Supprimer de la liste des clients
-        del self.clients[client_id]
+        # Arrêter la tâche d'envoi
+        if client.writer_task:
+            client.writer_task.cancel()
         
-        logger.info(f"🧹 Client {client_id} nettoyé")
+        self._release_client(client)
+        logger.info(f"🧹 Client client_{client_id} nettoyé")
+    
+    def _release_client(self, client: ClientConnection):
+        """Désabonne un client, vide sa file et libère son identifiant (idempotent)"""
+        # Désabonner de tous les canaux
+        subscribers = self.data_streamer.subscribers
+        for channel in client.subscriptions:
+            subscribers[_CHANNEL_INDEX[channel]].discard(client)
+        client.subscriptions.clear()
+        
+        queue = client.send_queue
+        while not queue.empty():
+            queue.get_nowait()
+        
+        # Supprimer de la liste des clients (l'emplacement a pu être réattribué)
+        client_id = client.client_id
+        if 0 <= client_id < len(self.clients) and self.clients[client_id] is client:
+            self.clients[client_id] = None
+            self._free_ids.append(client_id)
     
     def generate_client_token(self, user_id: str, permissions: List[str] = None) -> str:
         """Génère un token pour un client (helper function)"""
@@ -616,6 +919,8 @@ class WebSocketRealTimeServer:
         """Arrête le serveur"""
         self.running = False
         self.data_streamer.stop_streaming()
+        if self._timestamp_task:
+            self._timestamp_task.cancel()
         
         if self.server:
             self.server.close()
@@ -625,12 +930,13 @@ class WebSocketRealTimeServer:
     
     def get_server_stats(self) -> Dict[str, Any]:
         """Statistiques du serveur"""
-        total_clients = len(self.clients)
-        authenticated_clients = len([c for c in self.clients.values() if c.authenticated])
+        active_clients = [c for c in self.clients if c is not None]
+        total_clients = len(active_clients)
+        authenticated_clients = sum(1 for c in active_clients if c.authenticated)
         
         subscriptions_by_channel = {}
         for channel in ChannelType:
-            subscriptions_by_channel[channel.value] = len(self.data_streamer.subscribers[channel])
+            subscriptions_by_channel[channel.value] = len(self.data_streamer.subscribers[_CHANNEL_INDEX[channel]])
         
         return {
             'running': self.running,
@@ -642,6 +948,14 @@ class WebSocketRealTimeServer:
             'port': self.port
         }
 
+def run_server(host: str = "localhost", port: int = 8765, secret_key: str = "ultra_secret_key_2025"):
+    """Point d'entrée du serveur : boucle libuv (uvloop) si disponible, service jusqu'à l'arrêt"""
+    server = WebSocketRealTimeServer(host=host, port=port, secret_key=secret_key)
+    if UVLOOP_AVAILABLE:
+        uvloop.run(server.start_server())
+    else:
+        asyncio.run(server.start_server())
+
 # ============================================================================
 # 🧪 TESTS ET DÉMONSTRATION
 # ============================================================================
@@ -680,6 +994,10 @@ async def test_websocket_server():
         return False
 
 if __name__ == "__main__":
+    if "--serve" in sys.argv:
+        run_server()
+        sys.exit(0)
+    
     print("📊 WEBSOCKETS TEMPS RÉEL - TRADINGBOT PRO 2025")
     print("=" * 55)
     
@@ -4,9 +4,9 @@ Workers optimisés avec gestion d'erreurs avancée et monitoring en temps réel
 """
 
 import asyncio
+import os
 import time
 import logging
-import traceback
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Callable, Optional
 from dataclasses import dataclass, field
@@ -14,7 +14,16 @@ from enum import Enum
 import json
 import uuid
 from collections import defaultdict, deque
-import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Décalage horloge murale / monotone pour matérialiser les dates à la demande
+_WALL_CLOCK_OFFSET = time.time() - time.monotonic()
+
+def _mono_to_datetime(mono: Optional[float]) -> Optional[datetime]:
+    """Conversion d'un instant monotone en datetime"""
+    if mono is None:
+        return None
+    return datetime.fromtimestamp(_WALL_CLOCK_OFFSET + mono)
 
 class TaskPriority(Enum):
     """Priorités des tâches"""
@@ -24,6 +33,13 @@ class TaskPriority(Enum):
     LOW = 4         # Maintenance
     BACKGROUND = 5  # Logs, cleanup
 
+# Ordre de scan et rétrogradation précalculés (évite l'itération d'Enum à chaud)
+_PRIORITY_ORDER = tuple(sorted(TaskPriority, key=lambda p: p.value))
+_DOWNGRADE = {p: TaskPriority(min(p.value + 1, 5)) for p in TaskPriority}
+
+# Granularité de la roue de timers partagée pour les timeouts de tâches (secondes)
+TIMER_WHEEL_RESOLUTION = 0.1
+
 class TaskStatus(Enum):
     """Statuts des tâches"""
     PENDING = "pending"
@@ -32,7 +48,7 @@ class TaskStatus(Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """Définition d'une tâche"""
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
@@ -43,41 +59,68 @@ class Task:
     timeout: float = 30.0
     max_retries: int = 3
     created_at: datetime = field(default_factory=datetime.now)
-    started_at: Optional[datetime] = None
-    completed_at: Optional[datetime] = None
+    started_mono: Optional[float] = None
+    completed_mono: Optional[float] = None
     status: TaskStatus = TaskStatus.PENDING
     result: Any = None
     error: Optional[str] = None
     retries: int = 0
     worker_id: Optional[str] = None
+    batchable: bool = False          # callback(list[data]) -> list[result]
+    executor: str = "inline"         # inline | thread | process (callbacks synchrones)
+    batch_key: Optional[str] = None
+    
+    @property
+    def started_at(self) -> Optional[datetime]:
+        return _mono_to_datetime(self.started_mono)
+    
+    @property
+    def completed_at(self) -> Optional[datetime]:
+        return _mono_to_datetime(self.completed_mono)
 
-@dataclass
+@dataclass(slots=True)
 class WorkerStats:
     """Statistiques d'un worker"""
     worker_id: str
     tasks_completed: int = 0
     tasks_failed: int = 0
     total_processing_time: float = 0.0
-    last_activity: datetime = field(default_factory=datetime.now)
+    last_activity_mono: float = field(default_factory=time.monotonic)
     current_task: Optional[str] = None
     is_healthy: bool = True
     error_rate: float = 0.0
+    consecutive_failures: int = 0
+    
+    @property
+    def last_activity(self) -> datetime:
+        return _mono_to_datetime(self.last_activity_mono)
 
 class UltraRobustWorkerSystem:
     """Système de workers ultra-robuste avec monitoring avancé"""
     
-    def __init__(self, max_workers: int = 5, queue_size: int = 1000):
+    def __init__(self, max_workers: int = 5, queue_size: int = 1000,
+                 concurrency_multiplier: int = 4):
         self.max_workers = max_workers
         self.queue_size = queue_size
+        self.concurrency_multiplier = concurrency_multiplier
         
-        # Queues par priorité
-        self.priority_queues = {
-            TaskPriority.CRITICAL: asyncio.Queue(maxsize=100),
-            TaskPriority.HIGH: asyncio.Queue(maxsize=200),
-            TaskPriority.MEDIUM: asyncio.Queue(maxsize=300),
-            TaskPriority.LOW: asyncio.Queue(maxsize=200),
-            TaskPriority.BACKGROUND: asyncio.Queue(maxsize=200)
+        # Queues par priorité, shardées par worker (limites globales par priorité)
+        self.queue_limits = {
+            TaskPriority.CRITICAL: 100,
+            TaskPriority.HIGH: 200,
+            TaskPriority.MEDIUM: 300,
+            TaskPriority.LOW: 200,
+            TaskPriority.BACKGROUND: 200
         }
+        self.shards: List[Dict[TaskPriority, deque]] = [
+            {priority: deque() for priority in _PRIORITY_ORDER}
+            for _ in range(max_workers)
+        ]
+        self._shard_queues = [tuple(shard.items()) for shard in self.shards]
+        self._shard_events = [asyncio.Event() for _ in range(max_workers)]
+        self._idle_shards = set()
+        self._queued = dict.fromkeys(TaskPriority, 0)
+        self._rr_counter = 0
         
         # État du système
         self.workers = {}
@@ -85,7 +128,20 @@ class UltraRobustWorkerSystem:
         self.is_running = False
         self.shutdown_event = asyncio.Event()
         
+        # Slots d'exécution concurrente partagés (tâches I/O en vol)
+        self._slots = asyncio.Semaphore(max_workers * concurrency_multiplier)
+        self._inflight = set()
+        self._critical_worker_id = "critical-fast-path"  # Compteurs dédiés du chemin rapide CRITICAL
+        
+        # Roue de timers: bucket -> [[tâche asyncio, expirée], ...]
+        self._timer_wheel = defaultdict(list)
+        self._wheel_cursor = 0
+        
+        # Pools persistants pour les callbacks bloquants (créés au démarrage)
+        self._executors = {}
+        
         # Monitoring et métriques
+        # Historique: (id, nom, priorité, début, fin, statut) sans retenir data/result
         self.task_history = deque(maxlen=1000)
         self.performance_metrics = {
             'total_tasks': 0,
@@ -93,13 +149,21 @@ class UltraRobustWorkerSystem:
             'failed_tasks': 0,
             'avg_processing_time': 0.0,
             'queue_sizes': {},
-            'worker_utilization': 0.0
+            'worker_utilization': 0.0,
+            # Compteurs de contre-pression par priorité
+            'queue_writes_total': {priority.name: 0 for priority in TaskPriority},
+            'queue_full_drops_total': {priority.name: 0 for priority in TaskPriority},
+            'queue_retry_requeued_total': {priority.name: 0 for priority in TaskPriority}
         }
+        self._total_processing_time = 0.0
+        self._backpressure_snapshot = {priority: (0, 0) for priority in TaskPriority}
+        self.max_drop_rate = 0.05
         
         # Configuration
         self.health_check_interval = 30.0
         self.stats_update_interval = 10.0
         self.max_consecutive_failures = 5
+        self.batch_size = 32
         
         # Callbacks
         self.task_callbacks = {
@@ -108,6 +172,8 @@ class UltraRobustWorkerSystem:
             'on_task_failed': [],
             'on_worker_error': []
         }
+        self._sync_cb = {event: () for event in self.task_callbacks}
+        self._async_cb = {event: () for event in self.task_callbacks}
         
         # Logger
         self.logger = self._setup_logger()
@@ -133,28 +199,35 @@ class UltraRobustWorkerSystem:
             return True
         
         try:
-            self.logger.info(f"🚀 Démarrage système workers ({self.max_workers} workers)")
+            self.logger.info("🚀 Démarrage système workers (%s workers)", self.max_workers)
             
             self.is_running = True
             self.shutdown_event.clear()
             
+            # Pools réutilisés pendant toute la vie du système
+            self._executors = {
+                'thread': ThreadPoolExecutor(max_workers=32, thread_name_prefix="worker-pool"),
+                'process': ProcessPoolExecutor(max_workers=os.cpu_count())
+            }
+            
             # Démarrer les workers
             for i in range(self.max_workers):
                 worker_id = f"worker-{i+1}"
-                worker_task = asyncio.create_task(self._worker_loop(worker_id))
+                worker_task = asyncio.create_task(self._worker_loop(worker_id, i))
                 self.workers[worker_id] = worker_task
                 self.worker_stats[worker_id] = WorkerStats(worker_id=worker_id)
+            self.worker_stats[self._critical_worker_id] = WorkerStats(worker_id=self._critical_worker_id)
             
             # Démarrer les tâches de monitoring
-            asyncio.create_task(self._health_monitor())
-            asyncio.create_task(self._stats_updater())
+            asyncio.create_task(self._monitor_loop())
+            asyncio.create_task(self._timer_wheel_loop())
             asyncio.create_task(self._queue_balancer())
             
             self.logger.info("✅ Système workers démarré avec succès")
             return True
             
         except Exception as e:
-            self.logger.error(f"❌ Erreur démarrage workers: {e}")
+            self.logger.error("❌ Erreur démarrage workers: %s", e)
             return False
     
     async def stop(self, timeout: float = 30.0) -> bool:
@@ -168,147 +241,307 @@ class UltraRobustWorkerSystem:
             self.is_running = False
             self.shutdown_event.set()
             
-            # Annuler tous les workers
+            # Annuler tous les workers et les tâches en vol
             for worker_id, worker_task in self.workers.items():
                 worker_task.cancel()
+            for inflight in self._inflight:
+                inflight.cancel()
             
             # Attendre l'arrêt avec timeout
             try:
                 await asyncio.wait_for(
-                    asyncio.gather(*self.workers.values(), return_exceptions=True),
+                    asyncio.gather(*self.workers.values(), *self._inflight, return_exceptions=True),
                     timeout=timeout
                 )
             except asyncio.TimeoutError:
                 self.logger.warning("⚠️ Timeout atteint lors de l'arrêt")
             
-            # Nettoyer les queues
+            # Nettoyer les queues et libérer les pools
             await self._clear_all_queues()
+            for pool in self._executors.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+            self._executors = {}
             
             self.logger.info("✅ Système workers arrêté")
             return True
             
         except Exception as e:
-            self.logger.error(f"❌ Erreur arrêt workers: {e}")
+            self.logger.error("❌ Erreur arrêt workers: %s", e)
             return False
     
-    async def _worker_loop(self, worker_id: str):
+    async def _worker_loop(self, worker_id: str, shard_index: int):
         """Boucle principale d'un worker"""
-        self.logger.info(f"🔄 Worker {worker_id} démarré")
+        self.logger.info("🔄 Worker %s démarré", worker_id)
         stats = self.worker_stats[worker_id]
-        consecutive_failures = 0
+        batch = deque()
+        
+        # Références locales pour la boucle chaude
+        shutdown = self.shutdown_event
+        get_next_batch = self._get_next_batch
+        batch_size = self.batch_size
+        acquire = self._slots.acquire
+        launch = self._launch
+        process_task = self._process_task_release
+        process_group = self._process_group_release
+        max_failures = self.max_consecutive_failures
         
-        while self.is_running and not self.shutdown_event.is_set():
+        while self.is_running and not shutdown.is_set():
             try:
-                # Récupérer une tâche avec priorité
-                task = await self._get_next_task()
+                # Récupérer un lot de tâches avec priorité
+                if not batch:
+                    batch.extend(await get_next_batch(shard_index, batch_size))
+                task = batch.popleft()
                 
-                if task is None:
-                    await asyncio.sleep(0.1)
-                    continue
+                # Regrouper les tâches consécutives groupables (même callback et clé)
+                group = [task]
+                if task.batchable:
+                    key = (task.callback, task.batch_key)
+                    while batch and batch[0].batchable and (batch[0].callback, batch[0].batch_key) == key:
+                        group.append(batch.popleft())
                 
-                # Traiter la tâche
-                success = await self._process_task(task, worker_id)
-                
-                if success:
-                    consecutive_failures = 0
-                    stats.tasks_completed += 1
+                # Lancer la tâche dès qu'un slot d'exécution est libre
+                await acquire()
+                if len(group) > 1:
+                    launch(process_group(group, worker_id))
                 else:
-                    consecutive_failures += 1
-                    stats.tasks_failed += 1
+                    launch(process_task(task, worker_id))
                 
                 # Vérifier la santé du worker
-                if consecutive_failures >= self.max_consecutive_failures:
-                    self.logger.warning(f"⚠️ Worker {worker_id} en difficulté")
+                if stats.consecutive_failures >= max_failures:
+                    self.logger.warning("⚠️ Worker %s en difficulté", worker_id)
                     stats.is_healthy = False
                     await asyncio.sleep(5)  # Pause récupération
-                    consecutive_failures = 0
+                    stats.consecutive_failures = 0
                 else:
                     stats.is_healthy = True
                 
-                stats.last_activity = datetime.now()
-                
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                consecutive_failures += 1
+                stats.consecutive_failures += 1
                 stats.tasks_failed += 1
-                self.logger.error(f"❌ Erreur worker {worker_id}: {e}")
+                self.logger.error("❌ Erreur worker %s: %s", worker_id, e)
                 await self._trigger_callback('on_worker_error', worker_id, str(e))
                 await asyncio.sleep(1)  # Pause avant retry
         
+        for task in batch:
+            task.status = TaskStatus.CANCELLED
+        
         stats.current_task = None
-        self.logger.info(f"🛑 Worker {worker_id} arrêté")
+        self.logger.info("🛑 Worker %s arrêté", worker_id)
     
-    async def _get_next_task(self) -> Optional[Task]:
-        """Récupération de la prochaine tâche selon priorité"""
-        for priority in TaskPriority:
-            queue = self.priority_queues[priority]
+    async def _get_next_batch(self, shard_index: int, max_tasks: int) -> List[Task]:
+        """Récupération d'un lot de tâches du shard du worker, sinon vol chez un voisin"""
+        event = self._shard_events[shard_index]
+        
+        while True:
+            batch = self._take_batch(shard_index, max_tasks) or self._steal_batch(shard_index, max_tasks)
+            if batch:
+                return batch
             
+            event.clear()
+            self._idle_shards.add(shard_index)
             try:
-                task = queue.get_nowait()
-                return task
-            except asyncio.QueueEmpty:
+                await event.wait()
+            finally:
+                self._idle_shards.discard(shard_index)
+    
+    def _take_batch(self, shard_index: int, max_tasks: int) -> Optional[List[Task]]:
+        """Extraction d'un lot de même priorité depuis un shard"""
+        for priority, queue in self._shard_queues[shard_index]:
+            if queue:
+                # Laisser la moitié du backlog disponible au vol par les voisins
+                count = min(max_tasks, (len(queue) + 1) // 2)
+                self._queued[priority] -= count
+                return [queue.popleft() for _ in range(count)]
+        
+        return None
+    
+    def _steal_batch(self, shard_index: int, max_tasks: int) -> Optional[List[Task]]:
+        """Vol de travail: lot de plus haute priorité disponible chez un autre worker"""
+        for priority in _PRIORITY_ORDER:
+            if not self._queued[priority]:
                 continue
+            
+            for offset in range(1, self.max_workers):
+                queue = self.shards[(shard_index + offset) % self.max_workers][priority]
+                if queue:
+                    count = min(max_tasks, (len(queue) + 1) // 2)
+                    self._queued[priority] -= count
+                    return [queue.popleft() for _ in range(count)]
         
         return None
     
-    async def _process_task(self, task: Task, worker_id: str) -> bool:
+    def _wake_worker(self, shard_index: int):
+        """Réveil du worker propriétaire du shard, ou d'un worker inactif pour vol"""
+        idle = self._idle_shards
+        if shard_index in idle:
+            idle.discard(shard_index)
+            self._shard_events[shard_index].set()
+        elif idle:
+            self._shard_events[idle.pop()].set()
+    
+    def _launch(self, coro):
+        """Création d'une tâche en vol (slot déjà acquis) et suivi pour l'arrêt"""
+        inflight = asyncio.create_task(coro)
+        self._inflight.add(inflight)
+        inflight.add_done_callback(self._inflight.discard)
+    
+    async def _process_task_release(self, task: Task, worker_id: str):
+        """Traitement d'une tâche en vol puis libération de son slot"""
+        try:
+            success = await self._process_task(task, worker_id)
+        finally:
+            self._slots.release()
+        
+        self._record_result(self.worker_stats[worker_id], success)
+    
+    async def _process_group_release(self, group: List[Task], worker_id: str):
+        """Traitement d'un groupe de tâches en vol puis libération de son slot"""
+        try:
+            successes = await self._process_group(group, worker_id)
+        finally:
+            self._slots.release()
+        
+        stats = self.worker_stats[worker_id]
+        for success in successes:
+            self._record_result(stats, success)
+    
+    def _record_result(self, stats: WorkerStats, success: bool):
+        """Mise à jour des compteurs du worker après une tâche"""
+        if success:
+            stats.consecutive_failures = 0
+            stats.tasks_completed += 1
+        else:
+            stats.consecutive_failures += 1
+            stats.tasks_failed += 1
+        
+        stats.last_activity_mono = time.monotonic()
+    
+    async def _process_group(self, group: List[Task], worker_id: str) -> List[bool]:
+        """Exécution groupée: un seul appel callback([data, ...]) pour tout le groupe"""
+        stats = self.worker_stats[worker_id]
+        start_time = time.monotonic()
+        
+        for task in group:
+            task.status = TaskStatus.RUNNING
+            task.started_mono = start_time
+            task.worker_id = worker_id
+            await self._trigger_callback('on_task_start', task)
+        
+        stats.current_task = group[0].id
+        try:
+            results = await self._run_with_deadline(
+                self._execute_group(group),
+                max(task.timeout for task in group)
+            )
+            if len(results) != len(group):
+                raise ValueError(f"{len(results)} résultats pour {len(group)} tâches")
+        except Exception as e:
+            # Repli sur le traitement unitaire (retries et timeouts gérés par tâche)
+            self.logger.warning("⚠️ Lot %s en échec, traitement unitaire: %s", group[0].name, e)
+            stats.current_task = None
+            return [await self._process_task(task, worker_id, notify_start=False) for task in group]
+        
+        for task, result in zip(group, results):
+            await self._complete_task(task, result, stats, share=len(group))
+            self.performance_metrics['total_tasks'] += 1
+        
+        stats.current_task = None
+        return [True] * len(group)
+    
+    async def _execute_group(self, group: List[Task]) -> List[Any]:
+        """Appel unique du callback groupé avec la liste des données"""
+        callback = group[0].callback
+        data = [task.data for task in group]
+        if asyncio.iscoroutinefunction(callback):
+            return await callback(data)
+        return await self._call_sync(group[0].executor, callback, data)
+    
+    async def _call_sync(self, executor: str, callback: Callable, data: Any) -> Any:
+        """Callback synchrone: en ligne ou déporté dans le pool thread/process"""
+        pool = self._executors.get(executor)
+        if pool is None:
+            return callback(data)
+        return await asyncio.get_running_loop().run_in_executor(pool, callback, data)
+    
+    async def _complete_task(self, task: Task, result: Any, stats: WorkerStats, share: int = 1):
+        """Enregistrement d'une tâche terminée avec succès"""
+        task.result = result
+        task.status = TaskStatus.COMPLETED
+        task.completed_mono = time.monotonic()
+        
+        await self._trigger_callback('on_task_complete', task)
+        
+        processing_time = (task.completed_mono - task.started_mono) / share
+        stats.total_processing_time += processing_time
+        self._total_processing_time += processing_time
+        
+        self.task_history.append((
+            task.id, task.name, task.priority.value,
+            task.started_mono, task.completed_mono, task.status.value
+        ))
+        self.performance_metrics['completed_tasks'] += 1
+    
+    async def _process_task(self, task: Task, worker_id: str, notify_start: bool = True) -> bool:
         """Traitement d'une tâche avec gestion complète d'erreurs"""
         stats = self.worker_stats[worker_id]
-        start_time = time.time()
+        start_time = time.monotonic()
         
         try:
             # Mettre à jour l'état
             task.status = TaskStatus.RUNNING
-            task.started_at = datetime.now()
+            task.started_mono = start_time
             task.worker_id = worker_id
             stats.current_task = task.id
             
-            await self._trigger_callback('on_task_start', task)
+            if notify_start:
+                await self._trigger_callback('on_task_start', task)
             
-            # Traitement avec timeout
-            try:
-                result = await asyncio.wait_for(
-                    self._execute_task(task),
-                    timeout=task.timeout
-                )
-                
-                task.result = result
-                task.status = TaskStatus.COMPLETED
-                task.completed_at = datetime.now()
-                
-                await self._trigger_callback('on_task_complete', task)
-                
-                processing_time = time.time() - start_time
-                stats.total_processing_time += processing_time
-                
-                self.task_history.append(task)
-                self.performance_metrics['completed_tasks'] += 1
-                
-                return True
-                
-            except asyncio.TimeoutError:
-                raise Exception(f"Timeout après {task.timeout}s")
+            # Traitement avec timeout, erreurs transitoires retentées sur place
+            for attempt in range(task.max_retries + 1):
+                try:
+                    result = await self._run_with_deadline(
+                        self._execute_task(task),
+                        task.timeout
+                    )
+                    task.error = None  # Erreur d'une tentative précédente, désormais sans objet
+                    break
+                except asyncio.TimeoutError:
+                    raise
+                except Exception as e:
+                    if task.retries >= task.max_retries:
+                        raise
+                    
+                    task.retries += 1
+                    task.error = str(e)
+                    self.logger.info("🔄 Retry tâche %s (%s/%s)", task.name, task.retries, task.max_retries)
+                    await asyncio.sleep(min(0.1 * 2 ** task.retries, 5))
+            
+            await self._complete_task(task, result, stats)
+            return True
             
         except Exception as e:
-            task.error = str(e)
+            timed_out = isinstance(e, asyncio.TimeoutError)
+            task.error = f"Timeout après {task.timeout}s" if timed_out else str(e)
             task.status = TaskStatus.FAILED
-            task.completed_at = datetime.now()
+            task.completed_mono = time.monotonic()
             
-            # Retry logic
-            if task.retries < task.max_retries:
+            # Seuls les timeouts repassent par la queue (le worker est libéré)
+            if timed_out and task.retries < task.max_retries:
                 task.retries += 1
                 task.status = TaskStatus.PENDING
                 
                 # Remettre en queue avec priorité réduite
-                retry_priority = TaskPriority(min(task.priority.value + 1, 5))
-                await self.add_task(task, retry_priority)
+                task.priority = _DOWNGRADE[task.priority]
+                self.performance_metrics['queue_retry_requeued_total'][task.priority.name] += 1
+                self._enqueue(task)
                 
-                self.logger.info(f"🔄 Retry tâche {task.name} ({task.retries}/{task.max_retries})")
+                self.logger.info("🔄 Retry tâche %s (%s/%s)", task.name, task.retries, task.max_retries)
             else:
                 await self._trigger_callback('on_task_failed', task)
                 self.performance_metrics['failed_tasks'] += 1
-                self.logger.error(f"❌ Échec définitif tâche {task.name}: {e}")
+                self.logger.error("❌ Échec définitif tâche %s: %s", task.name, task.error)
             
             return False
         
@@ -316,14 +549,52 @@ class UltraRobustWorkerSystem:
             stats.current_task = None
             self.performance_metrics['total_tasks'] += 1
     
+    async def _run_with_deadline(self, coro, timeout: float) -> Any:
+        """Exécution sous échéance armée dans la roue de timers (remplace wait_for)"""
+        current = asyncio.current_task()
+        entry = [current, False]
+        bucket = int((time.monotonic() + timeout) / TIMER_WHEEL_RESOLUTION) + 1
+        self._timer_wheel[bucket].append(entry)
+        
+        try:
+            return await coro
+        except asyncio.CancelledError:
+            if entry[1]:
+                current.uncancel()
+                raise asyncio.TimeoutError()
+            raise
+        finally:
+            entry[0] = None  # Désarmer sans retirer du bucket
+    
+    async def _timer_wheel_loop(self):
+        """Expiration groupée des échéances, un passage par bucket"""
+        self._wheel_cursor = int(time.monotonic() / TIMER_WHEEL_RESOLUTION)
+        
+        while self.is_running:
+            await asyncio.sleep(TIMER_WHEEL_RESOLUTION)
+            
+            now_bucket = int(time.monotonic() / TIMER_WHEEL_RESOLUTION)
+            for bucket in range(self._wheel_cursor, now_bucket + 1):
+                for entry in self._timer_wheel.pop(bucket, ()):
+                    if entry[0] is not None:
+                        entry[1] = True
+                        entry[0].cancel()
+            self._wheel_cursor = now_bucket + 1
+    
     async def _execute_task(self, task: Task) -> Any:
         """Exécution réelle d'une tâche"""
         try:
             if task.callback:
+                if task.batchable:
+                    # Callback groupé: toujours appelé avec une liste, même pour une tâche seule
+                    results = await self._execute_group([task])
+                    if len(results) != 1:
+                        raise ValueError(f"{len(results)} résultats pour 1 tâche")
+                    return results[0]
                 if asyncio.iscoroutinefunction(task.callback):
                     return await task.callback(task.data)
                 else:
-                    return task.callback(task.data)
+                    return await self._call_sync(task.executor, task.callback, task.data)
             else:
                 # Tâche générique
                 await asyncio.sleep(0.1)  # Simulation
@@ -338,19 +609,51 @@ class UltraRobustWorkerSystem:
             if priority:
                 task.priority = priority
             
-            queue = self.priority_queues[task.priority]
-            
-            try:
-                queue.put_nowait(task)
-                self.logger.debug(f"➕ Tâche ajoutée: {task.name} (priorité: {task.priority.name})")
-                return True
-            except asyncio.QueueFull:
-                self.logger.warning(f"⚠️ Queue {task.priority.name} pleine")
-                return False
+            return self._enqueue(task)
                 
         except Exception as e:
-            self.logger.error(f"❌ Erreur ajout tâche: {e}")
+            self.logger.error("❌ Erreur ajout tâche: %s", e)
+            return False
+    
+    def _admit(self, task: Task) -> bool:
+        """Contrôle de limite et comptage d'une tâche entrante (queue ou chemin rapide)"""
+        priority_name = task.priority.name
+        if self._queued[task.priority] >= self.queue_limits[task.priority]:
+            self.performance_metrics['queue_full_drops_total'][priority_name] += 1
+            self.logger.warning("⚠️ Queue %s pleine", priority_name)
             return False
+        
+        self.performance_metrics['queue_writes_total'][priority_name] += 1
+        return True
+    
+    def _enqueue(self, task: Task) -> bool:
+        """Insertion synchrone dans le shard suivant (chemin commun ajout/retry)"""
+        if not self._admit(task):
+            return False
+        
+        shard_index = self._rr_counter % self.max_workers
+        self._rr_counter += 1
+        
+        self.shards[shard_index][task.priority].append(task)
+        self._queued[task.priority] += 1
+        self._wake_worker(shard_index)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("➕ Tâche ajoutée: %s (priorité: %s)", task.name, task.priority.name)
+        return True
+    
+    async def add_critical_task(self, task: Task) -> bool:
+        """Tâche critique: exécution immédiate si un slot est libre et aucune CRITICAL n'attend, sinon queue"""
+        task.priority = TaskPriority.CRITICAL
+        
+        # Les tâches CRITICAL déjà en queue passent avant (ordre d'arrivée conservé)
+        if self.is_running and not self._queued[TaskPriority.CRITICAL] and not self._slots.locked():
+            if not self._admit(task):
+                return False
+            await self._slots.acquire()  # Ne suspend pas: un slot est libre
+            self._launch(self._process_task_release(task, self._critical_worker_id))
+            return True
+        
+        return await self.add_task(task)
     
     async def add_simple_task(self, name: str, callback: Callable, data: Dict = None, 
                             priority: TaskPriority = TaskPriority.MEDIUM) -> str:
@@ -365,113 +668,163 @@ class UltraRobustWorkerSystem:
         success = await self.add_task(task)
         return task.id if success else None
     
-    async def _health_monitor(self):
-        """Monitoring de santé des workers"""
+    async def _monitor_loop(self):
+        """Monitoring unifié: chaque job a sa propre échéance, une seule boucle attend la plus proche"""
+        next_stats = next_health = time.monotonic()
+        
         while self.is_running:
+            now = time.monotonic()
             try:
-                current_time = datetime.now()
-                
-                for worker_id, stats in self.worker_stats.items():
-                    # Vérifier l'activité récente
-                    time_since_activity = (current_time - stats.last_activity).total_seconds()
-                    
-                    if time_since_activity > 60:  # Plus d'activité depuis 1 minute
-                        stats.is_healthy = False
-                        self.logger.warning(f"⚠️ Worker {worker_id} inactif")
-                    
-                    # Calculer le taux d'erreur
-                    total_tasks = stats.tasks_completed + stats.tasks_failed
-                    if total_tasks > 0:
-                        stats.error_rate = stats.tasks_failed / total_tasks
-                    
-                await asyncio.sleep(self.health_check_interval)
-                
+                if now >= next_stats:
+                    self._update_stats()
+                if now >= next_health:
+                    self._check_health()
             except Exception as e:
-                self.logger.error(f"❌ Erreur health monitor: {e}")
-                await asyncio.sleep(self.health_check_interval)
+                self.logger.error("❌ Erreur monitor: %s", e)
+            
+            # Échéances avancées d'un intervalle (sans dérive), recalées si le retard dépasse un intervalle
+            if now >= next_stats:
+                next_stats += self.stats_update_interval
+                if next_stats <= now:
+                    next_stats = now + self.stats_update_interval
+            if now >= next_health:
+                next_health += self.health_check_interval
+                if next_health <= now:
+                    next_health = now + self.health_check_interval
+            
+            await asyncio.sleep(max(0.0, min(next_stats, next_health) - time.monotonic()))
+    
+    def _check_health(self):
+        """Monitoring de santé des workers"""
+        current_time = time.monotonic()
+        
+        for worker_id, stats in self.worker_stats.items():
+            # Vérifier l'activité récente (le chemin rapide CRITICAL n'est pas un worker)
+            time_since_activity = current_time - stats.last_activity_mono
+            
+            if time_since_activity > 60 and worker_id in self.workers:  # Plus d'activité depuis 1 minute
+                stats.is_healthy = False
+                self.logger.warning("⚠️ Worker %s inactif", worker_id)
+            
+            # Calculer le taux d'erreur
+            total_tasks = stats.tasks_completed + stats.tasks_failed
+            if total_tasks > 0:
+                stats.error_rate = stats.tasks_failed / total_tasks
     
-    async def _stats_updater(self):
+    def _update_stats(self):
         """Mise à jour des statistiques"""
-        while self.is_running:
-            try:
-                # Mettre à jour les métriques globales
-                total_processing_time = sum(
-                    stats.total_processing_time for stats in self.worker_stats.values()
-                )
-                
-                if self.performance_metrics['completed_tasks'] > 0:
-                    self.performance_metrics['avg_processing_time'] = (
-                        total_processing_time / self.performance_metrics['completed_tasks']
-                    )
-                
-                # Tailles des queues
-                self.performance_metrics['queue_sizes'] = {
-                    priority.name: queue.qsize()
-                    for priority, queue in self.priority_queues.items()
-                }
-                
-                # Utilisation des workers
-                active_workers = len([
-                    stats for stats in self.worker_stats.values()
-                    if stats.current_task is not None
-                ])
-                
-                self.performance_metrics['worker_utilization'] = (
-                    active_workers / self.max_workers * 100
-                )
-                
-                await asyncio.sleep(self.stats_update_interval)
-                
-            except Exception as e:
-                self.logger.error(f"❌ Erreur stats updater: {e}")
-                await asyncio.sleep(self.stats_update_interval)
+        metrics = self.performance_metrics
+        
+        # Temps total cumulé au fil de l'eau dans _process_task
+        if metrics['completed_tasks'] > 0:
+            metrics['avg_processing_time'] = (
+                self._total_processing_time / metrics['completed_tasks']
+            )
+        
+        # Tailles des queues (mise à jour en place, seulement si changement)
+        queue_sizes = metrics['queue_sizes']
+        for priority, count in self._queued.items():
+            if queue_sizes.get(priority.name) != count:
+                queue_sizes[priority.name] = count
+        
+        # Utilisation des slots d'exécution concurrente
+        metrics['worker_utilization'] = (
+            len(self._inflight) / (self.max_workers * self.concurrency_multiplier) * 100
+        )
     
     async def _queue_balancer(self):
         """Équilibrage intelligent des queues"""
         while self.is_running:
             try:
                 # Vérifier si les queues critiques sont surchargées
-                critical_queue = self.priority_queues[TaskPriority.CRITICAL]
-                high_queue = self.priority_queues[TaskPriority.HIGH]
-                
-                if critical_queue.qsize() > 50:
+                if self._queued[TaskPriority.CRITICAL] > 50:
                     self.logger.warning("⚠️ Queue critique surchargée")
-                    # Pourrait implémenter une logique de répartition
                 
-                if high_queue.qsize() > 100:
+                if self._queued[TaskPriority.HIGH] > 100:
                     self.logger.warning("⚠️ Queue haute priorité surchargée")
                 
+                self._rebalance_shards()
+                self._adapt_queue_limits()
+                
                 await asyncio.sleep(30)  # Vérifier toutes les 30 secondes
                 
             except Exception as e:
-                self.logger.error(f"❌ Erreur queue balancer: {e}")
+                self.logger.error("❌ Erreur queue balancer: %s", e)
                 await asyncio.sleep(30)
     
+    def _adapt_queue_limits(self):
+        """Agrandissement des queues dont le taux de rejet dépasse max_drop_rate"""
+        writes_total = self.performance_metrics['queue_writes_total']
+        drops_total = self.performance_metrics['queue_full_drops_total']
+        
+        for priority in _PRIORITY_ORDER:
+            writes = writes_total[priority.name]
+            drops = drops_total[priority.name]
+            last_writes, last_drops = self._backpressure_snapshot[priority]
+            self._backpressure_snapshot[priority] = (writes, drops)
+            
+            attempts = (writes - last_writes) + (drops - last_drops)
+            limit = self.queue_limits[priority]
+            if attempts and (drops - last_drops) / attempts > self.max_drop_rate and limit < self.queue_size:
+                self.queue_limits[priority] = min(self.queue_size, limit + limit // 2)
+                self.logger.warning("⚠️ Queue %s: limite portée à %s", priority.name,
+                                    self.queue_limits[priority])
+    
+    def _rebalance_shards(self):
+        """Redistribution entre shards quand le déséquilibre dépasse 2x"""
+        for priority in _PRIORITY_ORDER:
+            queues = [shard[priority] for shard in self.shards]
+            busiest = max(queues, key=len)
+            idlest = min(queues, key=len)
+            
+            if len(busiest) > 2 * len(idlest) + 1:
+                for _ in range((len(busiest) - len(idlest)) // 2):
+                    idlest.append(busiest.pop())
+        
+        for shard_index in list(self._idle_shards):
+            if any(self.shards[shard_index].values()):
+                self._wake_worker(shard_index)
+    
     async def _trigger_callback(self, event: str, *args):
-        """Déclenchement des callbacks"""
-        for callback in self.task_callbacks.get(event, []):
+        """Déclenchement des callbacks (pré-triés sync/async à l'enregistrement)"""
+        sync_cbs = self._sync_cb[event]
+        async_cbs = self._async_cb[event]
+        if not sync_cbs and not async_cbs:
+            return
+        
+        for callback in sync_cbs:
             try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback(*args)
-                else:
-                    callback(*args)
+                callback(*args)
             except Exception as e:
-                self.logger.error(f"❌ Erreur callback {event}: {e}")
+                self.logger.error("❌ Erreur callback %s: %s", event, e)
+        
+        if async_cbs:
+            results = await asyncio.gather(
+                *[callback(*args) for callback in async_cbs],
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    self.logger.error("❌ Erreur callback %s: %s", event, result)
     
     async def _clear_all_queues(self):
         """Vidage de toutes les queues"""
-        for priority, queue in self.priority_queues.items():
-            while not queue.empty():
-                try:
-                    task = queue.get_nowait()
+        for shard in self.shards:
+            for queue in shard.values():
+                for task in queue:
                     task.status = TaskStatus.CANCELLED
-                except asyncio.QueueEmpty:
-                    break
+                queue.clear()
+        
+        self._queued = dict.fromkeys(TaskPriority, 0)
     
     def add_callback(self, event: str, callback: Callable):
         """Ajout d'un callback pour un événement"""
         if event in self.task_callbacks:
             self.task_callbacks[event].append(callback)
+            if asyncio.iscoroutinefunction(callback):
+                self._async_cb[event] += (callback,)
+            else:
+                self._sync_cb[event] += (callback,)
     
     def get_stats(self) -> Dict:
         """Statistiques du système"""
@@ -483,28 +836,26 @@ class UltraRobustWorkerSystem:
                     'tasks_failed': stats.tasks_failed,
                     'error_rate': stats.error_rate,
                     'is_healthy': stats.is_healthy,
-                    'current_task': stats.current_task
+                    'current_task': stats.current_task,
+                    'last_activity': stats.last_activity.isoformat()
                 }
                 for worker_id, stats in self.worker_stats.items()
             },
             'queue_status': {
                 priority.name: {
-                    'size': queue.qsize(),
-                    'maxsize': queue.maxsize
+                    'size': count,
+                    'maxsize': self.queue_limits[priority]
                 }
-                for priority, queue in self.priority_queues.items()
+                for priority, count in self._queued.items()
             },
             'is_running': self.is_running
         }
     
     def get_health_report(self) -> Dict:
         """Rapport de santé du système"""
-        healthy_workers = len([
-            stats for stats in self.worker_stats.values()
-            if stats.is_healthy
-        ])
+        healthy_workers = sum(self.worker_stats[worker_id].is_healthy for worker_id in self.workers)
         
-        total_queue_size = sum(queue.qsize() for queue in self.priority_queues.values())
+        total_queue_size = sum(self._queued.values())
         
         return {
             'system_health': 'HEALTHY' if healthy_workers >= self.max_workers * 0.8 else 'DEGRADED',
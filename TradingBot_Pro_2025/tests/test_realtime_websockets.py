@@ -0,0 +1,64 @@
+"""
+Tests du serveur WebSocket temps réel
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import time
+
+# Chargé par chemin: le dossier src/websockets masquerait la bibliothèque websockets
+_spec = importlib.util.spec_from_file_location(
+    "realtime_websockets",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'websockets', 'realtime_websockets.py')
+)
+realtime_websockets = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(realtime_websockets)
+
+
+class _FakeWebSocket:
+    """Socket minimale: retient les trames envoyées"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, frame):
+        self.sent.append(json.loads(frame))
+
+
+def test_unhashable_message_type_is_rejected_as_unknown():
+    async def scenario():
+        server = realtime_websockets.WebSocketRealTimeServer()
+        client = realtime_websockets.ClientConnection(websocket=_FakeWebSocket())
+
+        await server.process_message(client, json.dumps({'type': ['subscribe']}))
+        await server.process_message(client, json.dumps({'type': 'nope'}))
+
+        return [frame['data']['message'] for frame in client.websocket.sent]
+
+    assert asyncio.run(scenario()) == ["Type de message non reconnu"] * 2
+
+
+def test_subscriptions_are_counted_per_channel():
+    async def scenario():
+        server = realtime_websockets.WebSocketRealTimeServer()
+        streamer = server.data_streamer
+        client = realtime_websockets.ClientConnection(websocket=_FakeWebSocket())
+        ChannelType = realtime_websockets.ChannelType
+
+        streamer.subscribe_client(client, ChannelType.TRADES)
+        streamer.subscribe_client(client, ChannelType.ALERTS)
+        streamer.unsubscribe_client(client, ChannelType.ALERTS)
+        return server.get_server_stats()['subscriptions_by_channel']
+
+    counts = asyncio.run(scenario())
+    assert counts == {channel.value: int(channel.value == 'trades') for channel in realtime_websockets.ChannelType}
+    assert not hasattr(realtime_websockets, '_channel')
+
+
+def test_streamer_timestamps_advance_without_server():
+    streamer = realtime_websockets.RealTimeDataStreamer()
+    first = streamer._generate_price_data()['timestamp']
+    time.sleep(realtime_websockets.TIMESTAMP_REFRESH_INTERVAL * 1.2)
+    assert streamer._generate_price_data()['timestamp'] > first
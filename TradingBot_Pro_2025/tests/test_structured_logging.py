@@ -0,0 +1,70 @@
+"""
+Tests des logs structurés JSON
+"""
+
+import importlib
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+
+def _trade_records(logger, symbol):
+    """Enregistrements trade_executed d'un symbole, après vidage des shards"""
+    logger.flush()
+    records = []
+    for log_file in logger.log_dir.glob("trading_*.json"):
+        for line in log_file.read_text().splitlines():
+            entry = json.loads(line)
+            if entry.get('symbol') == symbol:
+                records.append(entry)
+    return records
+
+
+def test_trade_log_keeps_bound_strategy(tmp_path, monkeypatch):
+    # L'instance globale écrit dans ./logs : importée depuis un dossier temporaire
+    monkeypatch.chdir(tmp_path)
+    structured_logging = importlib.import_module("utils.structured_logging")
+    logger = structured_logging.structured_logger
+
+    structured_logging.bind_strategy_context("momentum", run_id="run-1")
+    try:
+        logger.log_trade_execution({'symbol': 'BOUND/USD', 'side': 'buy'}, True, 1.0)
+        logger.log_trade_execution({'symbol': 'EXPLICIT/USD', 'strategy': 'grid'}, True, 1.0)
+    finally:
+        structured_logging.clear_strategy_context()
+    logger.log_trade_execution({'symbol': 'DEFAULT/USD'}, True, 1.0)
+
+    bound, = _trade_records(logger, 'BOUND/USD')
+    assert bound['strategy'] == 'momentum'
+    assert bound['run_id'] == 'run-1'
+    assert _trade_records(logger, 'EXPLICIT/USD')[0]['strategy'] == 'grid'
+    assert _trade_records(logger, 'DEFAULT/USD')[0]['strategy'] == 'ai'
+
+
+def test_extra_instances_share_writers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    structured_logging = importlib.import_module("utils.structured_logging")
+    logger = structured_logging.structured_logger
+    logger.close()
+
+    # Aucun thread de shard tant qu'aucun trade n'est loggé
+    other = structured_logging.JSONStructuredLogger(log_dir=str(tmp_path / "other"))
+    assert not structured_logging._listeners
+    assert len(logging.getLogger("tradingbot.main").handlers) == 1
+
+    other.log_trade_execution({'symbol': 'DUP/USD'}, True, 1.0)
+    logger.log_trade_execution({'symbol': 'DUP/USD'}, True, 2.0)
+    assert len(structured_logging._listeners) == structured_logging.TRADING_SHARDS
+
+    # Trades écrits dès que le listener les dépile, sans attendre un tampon mémoire
+    for listener in structured_logging._listeners:
+        listener.queue.join()
+    records = []
+    for log_dir in {logger.log_dir.resolve(), other.log_dir.resolve()}:
+        for log_file in log_dir.glob("trading_*.json"):
+            records += [json.loads(line) for line in log_file.read_text().splitlines()
+                        if json.loads(line).get('symbol') == 'DUP/USD']
+    assert sorted(r['pnl'] for r in records) == [1.0, 2.0]
@@ -0,0 +1,226 @@
+"""
+Tests du système workers ultra-robuste
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from workers.ultra_robust_workers import Task, TaskPriority, TaskStatus, UltraRobustWorkerSystem
+
+
+async def _wait_done(tasks, timeout=5.0):
+    """Attente de la fin (succès ou échec) de toutes les tâches"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while any(t.status in (TaskStatus.PENDING, TaskStatus.RUNNING) for t in tasks):
+        assert asyncio.get_running_loop().time() < deadline, "tâches non terminées"
+        await asyncio.sleep(0.01)
+
+
+def test_single_batchable_task_receives_a_list():
+    async def scenario():
+        calls = []
+
+        async def batch_callback(payloads):
+            calls.append(payloads)
+            return [payload['symbol'].lower() for payload in payloads]
+
+        system = UltraRobustWorkerSystem(max_workers=2)
+        await system.start()
+        try:
+            task = Task(name="quote", callback=batch_callback, data={'symbol': 'BTC'},
+                        batchable=True, max_retries=0)
+            assert await system.add_task(task)
+            await _wait_done([task])
+        finally:
+            await system.stop(timeout=1.0)
+
+        assert task.status == TaskStatus.COMPLETED, task.error
+        assert task.result == 'btc'
+        assert calls == [[{'symbol': 'BTC'}]]
+
+    asyncio.run(scenario())
+
+
+def test_failed_group_falls_back_to_list_calls():
+    async def scenario():
+        async def batch_callback(payloads):
+            # Mauvais nombre de résultats pour un lot: repli unitaire
+            if len(payloads) > 1:
+                return []
+            return [payloads[0]['n'] * 2]
+
+        system = UltraRobustWorkerSystem(max_workers=1)
+        system.batch_size = 4
+        tasks = [Task(name=f"t{i}", callback=batch_callback, data={'n': i},
+                      batchable=True, max_retries=0) for i in range(4)]
+        for task in tasks:
+            assert await system.add_task(task)
+        await system.start()
+        try:
+            await _wait_done(tasks)
+        finally:
+            await system.stop(timeout=1.0)
+
+        assert [t.status for t in tasks] == [TaskStatus.COMPLETED] * 4
+        assert [t.result for t in tasks] == [0, 2, 4, 6]
+
+    asyncio.run(scenario())
+
+
+def test_critical_fast_path_respects_queued_critical_tasks():
+    async def scenario():
+        order = []
+
+        async def record(data):
+            order.append(data['n'])
+
+        system = UltraRobustWorkerSystem(max_workers=1)
+        await system.start()
+        try:
+            # Une CRITICAL déjà en attente : la nouvelle passe par la queue, derrière elle
+            queued = Task(name="queued", callback=record, data={'n': 1},
+                          priority=TaskPriority.CRITICAL)
+            system._enqueue(queued)
+            late = Task(name="late", callback=record, data={'n': 2})
+            assert await system.add_critical_task(late)
+            await _wait_done([queued, late])
+
+            # File CRITICAL vide : exécution directe, comptée à part
+            fast = Task(name="fast", callback=record, data={'n': 3})
+            assert await system.add_critical_task(fast)
+            await _wait_done([fast])
+        finally:
+            await system.stop(timeout=1.0)
+
+        assert order == [1, 2, 3]
+        assert fast.worker_id == "critical-fast-path"
+        assert system.worker_stats["critical-fast-path"].tasks_completed == 1
+        assert system.performance_metrics['queue_writes_total']['CRITICAL'] == 3
+
+    asyncio.run(scenario())
+
+
+def test_monitor_honours_sub_second_intervals():
+    async def scenario():
+        system = UltraRobustWorkerSystem(max_workers=1)
+        system.stats_update_interval = 0.05
+        system.health_check_interval = 0.2
+        calls = {'stats': 0, 'health': 0}
+        update_stats, check_health = system._update_stats, system._check_health
+
+        def count_stats():
+            calls['stats'] += 1
+            update_stats()
+
+        def count_health():
+            calls['health'] += 1
+            check_health()
+
+        system._update_stats, system._check_health = count_stats, count_health
+        await system.start()
+        try:
+            await asyncio.sleep(0.42)
+        finally:
+            await system.stop(timeout=1.0)
+
+        # Intervalle < 1s: ni arrondi à 0 ni à 1 seconde
+        assert 5 <= calls['stats'] <= 11, calls
+        assert 2 <= calls['health'] <= 4, calls
+
+    asyncio.run(scenario())
+
+
+def test_timer_wheel_expires_slow_task():
+    async def scenario():
+        async def slow(_data):
+            await asyncio.sleep(5)
+
+        system = UltraRobustWorkerSystem(max_workers=1)
+        await system.start()
+        try:
+            task = Task(name="slow", callback=slow, timeout=0.2, max_retries=0)
+            assert await system.add_task(task)
+            await _wait_done([task], timeout=2.0)
+        finally:
+            await system.stop(timeout=1.0)
+
+        assert task.status == TaskStatus.FAILED
+        assert task.error.startswith("Timeout")
+
+    asyncio.run(scenario())
+
+
+def test_transient_error_is_retried_in_place():
+    async def scenario():
+        attempts = []
+
+        async def flaky(data):
+            attempts.append(data)
+            if len(attempts) < 2:
+                raise ConnectionError("reset")
+            return "ok"
+
+        system = UltraRobustWorkerSystem(max_workers=1)
+        await system.start()
+        try:
+            task = Task(name="flaky", callback=flaky, data=1, max_retries=2)
+            assert await system.add_task(task)
+            await _wait_done([task])
+        finally:
+            await system.stop(timeout=1.0)
+
+        assert task.status == TaskStatus.COMPLETED
+        assert task.result == "ok"
+        assert task.retries == 1
+        assert task.error is None
+        assert system.performance_metrics['queue_retry_requeued_total'] == {p.name: 0 for p in TaskPriority}
+
+    asyncio.run(scenario())
+
+
+def test_sync_callback_runs_in_persistent_thread_pool():
+    async def scenario():
+        import threading
+
+        def blocking(_data):
+            return threading.current_thread().name
+
+        system = UltraRobustWorkerSystem(max_workers=2)
+        await system.start()
+        try:
+            tasks = [Task(name=f"b{i}", callback=blocking, executor="thread") for i in range(4)]
+            for task in tasks:
+                assert await system.add_task(task)
+            await _wait_done(tasks)
+            pool = system._executors['thread']
+        finally:
+            await system.stop(timeout=1.0)
+
+        assert all(t.result.startswith("worker-pool") for t in tasks)
+        assert system._executors == {}
+        assert pool._shutdown
+
+    asyncio.run(scenario())
+
+
+def test_shards_are_filled_round_robin_and_rebalanced():
+    async def scenario():
+        system = UltraRobustWorkerSystem(max_workers=2)
+        tasks = [Task(name=f"s{i}") for i in range(6)]
+        for task in tasks:
+            assert await system.add_task(task)
+
+        assert [len(shard[TaskPriority.MEDIUM]) for shard in system.shards] == [3, 3]
+
+        # Déséquilibre > 2x: la moitié de l'écart change de shard
+        system.shards[0][TaskPriority.MEDIUM].extend(system.shards[1][TaskPriority.MEDIUM])
+        system.shards[1][TaskPriority.MEDIUM].clear()
+        system._rebalance_shards()
+
+        assert [len(shard[TaskPriority.MEDIUM]) for shard in system.shards] == [3, 3]
+        assert system._queued[TaskPriority.MEDIUM] == 6
+
+    asyncio.run(scenario())
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compilation anticipée (AOT) des noyaux du moteur IA Quantique
+Usage: python -m ai._compile_kernels  (produit ai/quantum_kernels*.so)
+"""
+
+import os
+
+from numba.pycc import CC
+
+from ai._quantum_kernels import quantum_score, quantum_scores, decide, decide_batch
+
+# Signatures fixes: le module compilé n'accepte que ces types
+KERNEL_SIGNATURES = {
+    'quantum_score': (quantum_score, 'f8(f8, f8, f8, f8, f8)'),
+    'quantum_scores': (quantum_scores, 'f8[:](f8[:], f8[:], f8, f8, f8)'),
+    'decide': (decide, 'UniTuple(f8, 3)(f8, f8, f8, f8, f8, f8, f8, f8, f8)'),
+    'decide_batch': (decide_batch,
+                     'Tuple((i8[:], f8[:], f8[:]))(f8[:], f8[:], f8, f8[:], f8, f8, f8, f8, f8)'),
+}
+
+
+def compile_kernels(module_name, output_dir, signatures):
+    """Compile des noyaux @njit en module natif `module_name` ({nom: (noyau, signature)})"""
+    cc = CC(module_name)
+    cc.output_dir = output_dir
+
+    for name, (kernel, signature) in signatures.items():
+        # pycc compile la fonction Python d'origine, pas le dispatcher @njit
+        cc.export(name, signature)(kernel.py_func)
+
+    cc.compile()
+    return cc.output_dir
+
+
+def build():
+    """Compile les noyaux dans ai/quantum_kernels"""
+    output_dir = compile_kernels('quantum_kernels', os.path.dirname(os.path.abspath(__file__)),
+                                 KERNEL_SIGNATURES)
+    print(f"✅ Noyaux compilés dans {output_dir}")
+
+
+if __name__ == "__main__":
+    build()
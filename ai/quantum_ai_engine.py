@@ -12,11 +12,32 @@ import time
 import random
 import threading
 import numpy as np
+from collections import deque
 from datetime import datetime, timedelta
 
 # Import du système de logging
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from logging_system import get_logger, log_signal_analysis, log_trade_attempt
+try:
+    # Noyaux précompilés (python -m ai._compile_kernels): pas de compilation au démarrage
+    from .quantum_kernels import quantum_score, quantum_scores, decide, decide_batch
+except ImportError:
+    from ._quantum_kernels import quantum_score, quantum_scores, decide, decide_batch
+
+# Métriques quantiques et leurs valeurs de base
+_QK_KEYS = ('superposition', 'entanglement', 'momentum')
+_QK_BASES = (73.2, 82.5, 65.8)
+
+# Libellés indexés par les codes d'action du noyau decide()
+_ACTIONS = ('HOLD', 'BUY', 'SELL')
+
+# Libellés de sentiment indexés par (score >= -0.2) + (score > 0.2)
+_SENTIMENT_LABELS = ('bearish', 'neutral', 'bullish')
+
+# Modèles IA: une ligne par modèle dans les tableaux de TradingAI
+_MODEL_NAMES = ('lstm', 'random_forest', 'bert_sentiment', 'gbm_volatility')
+_MODEL_COUNTER_FIELDS = ('predictions', 'signals', 'analyses', 'forecasts')
+_LSTM, _RANDOM_FOREST, _BERT_SENTIMENT, _GBM_VOLATILITY = range(len(_MODEL_NAMES))
 
 class TradingAI:
     """
@@ -32,13 +53,14 @@ class TradingAI:
         self.is_active = False
         self.decisions_made = 0
 
-        # Modèles IA
-        self.models = {
-            'lstm': {'accuracy': 87.3, 'predictions': 0},
-            'random_forest': {'accuracy': 72.1, 'signals': 0},
-            'bert_sentiment': {'accuracy': 91.5, 'analyses': 0},
-            'gbm_volatility': {'accuracy': 78.4, 'forecasts': 0}
-        }
+        # Un seul thread de mise à jour, réveillé immédiatement à l'arrêt
+        self.ai_thread = None
+        self._stop_event = threading.Event()
+        self._thread_lock = threading.Lock()
+
+        # Modèles IA (tableaux parallèles indexés comme _MODEL_NAMES)
+        self._model_accuracy = np.array([87.3, 72.1, 91.5, 78.4])
+        self._model_counters = np.zeros(len(_MODEL_NAMES), dtype=np.int64)
 
         # Métriques quantiques (mises à jour en continu)
         self.quantum = {
@@ -48,6 +70,9 @@ class TradingAI:
             'coherence': 95.0
         }
 
+        # Cohérence ayant servi au dernier calcul de confiance du sentiment
+        self._last_coherence = None
+
         # Sentiment de marché
         self.sentiment = {
             'score': 0.23,  # -1 à +1
@@ -56,8 +81,14 @@ class TradingAI:
             'sources': ['news', 'social', 'technical']
         }
 
-        # Historique des décisions IA
-        self.decision_history = []
+        # Empreintes quantiques déjà calculées, par symbole
+        self._symbol_hash_cache = {}
+
+        # Générateur dédié (PCG64) pour les mises à jour continues
+        self._rng = np.random.default_rng()
+
+        # Historique des décisions IA (borné: seules les dernières sont exposées)
+        self.decision_history = deque(maxlen=256)
 
         # Configuration AI
         self.ai_config = {
@@ -68,28 +99,38 @@ class TradingAI:
             'technical_weight': 0.10,
             'update_interval': 3  # secondes
         }
+        self._refresh_weights()
 
         self.logger.info("🧠 Moteur IA Quantique initialisé")
 
     def activate(self):
         """Active l'IA - appelée quand le bot démarre"""
-        self.is_active = True
-        self.logger.info(f"🧠 IA activée - {len(self.models)} modèles opérationnels")
+        with self._thread_lock:
+            self.is_active = True
+            self._stop_event.clear()
+            self.logger.info(f"🧠 IA activée - {len(_MODEL_NAMES)} modèles opérationnels")
 
-        # Démarrage du thread de mise à jour IA
-        self.ai_thread = threading.Thread(target=self._ai_continuous_update, daemon=True)
-        self.ai_thread.start()
+            # Démarrage du thread de mise à jour IA (s'il ne tourne pas déjà)
+            if self.ai_thread is None:
+                self.ai_thread = threading.Thread(target=self._ai_continuous_update, daemon=True)
+                self.ai_thread.start()
 
         return True
 
     def deactivate(self):
         """Désactive l'IA - appelée quand le bot s'arrête"""
         self.is_active = False
+        self._stop_event.set()
         self.logger.warning("🧠 IA désactivée")
 
     def _ai_continuous_update(self):
         """Mise à jour continue de l'IA quand elle est active"""
-        while self.is_active:
+        while True:
+            with self._thread_lock:
+                if not self.is_active:
+                    self.ai_thread = None
+                    return
+
             try:
                 # Mise à jour des métriques quantiques
                 self._update_quantum_state()
@@ -100,53 +141,75 @@ class TradingAI:
                 # Mise à jour des performances des modèles
                 self._update_model_performance()
 
-                time.sleep(self.ai_config['update_interval'])
+                self._stop_event.wait(self.ai_config['update_interval'])
 
             except Exception as e:
                 self.logger.error(f"❌ Erreur IA: {e}")
-                time.sleep(5)
+                self._stop_event.wait(5)
 
     def _update_quantum_state(self):
         """Met à jour l'état quantique en temps réel"""
-        for key in ['superposition', 'entanglement', 'momentum']:
-            base_values = {'superposition': 73.2, 'entanglement': 82.5, 'momentum': 65.8}
-            base = base_values[key]
+        # Tous les tirages du tick en un seul appel
+        *draws, coherence_draw = self._rng.random(4).tolist()
 
+        # Nouvel état construit à part puis publié d'un bloc (jamais lu à moitié)
+        quantum = {}
+        total = 0.0
+        for key, base, r in zip(_QK_KEYS, _QK_BASES, draws):
             # Évolution quantique avec décoherence
-            variation = (random.random() - 0.5) * 20
-            self.quantum[key] = max(25, min(95, base + variation))
+            variation = (r - 0.5) * 20
+            value = max(25, min(95, base + variation))
+            quantum[key] = value
+            total += value
 
         # Cohérence quantique globale
-        avg_quantum = sum(list(self.quantum.values())[:3]) / 3
-        self.quantum['coherence'] = min(99, max(50, avg_quantum + random.uniform(-5, 5)))
+        avg_quantum = total / 3
+        quantum['coherence'] = min(99, max(50, avg_quantum + (coherence_draw - 0.5) * 10))
+        self.quantum = quantum
 
     def _analyze_market_sentiment(self):
         """Analyse continue du sentiment de marché"""
         # Évolution du sentiment
-        drift = (random.random() - 0.5) * 0.1
-        self.sentiment['score'] += drift
-        self.sentiment['score'] = max(-1, min(1, self.sentiment['score']))
+        drift = (self._rng.random() - 0.5) * 0.1
+        score = max(-1, min(1, self.sentiment['score'] + drift))
 
         # Mise à jour du label
-        if self.sentiment['score'] > 0.2:
-            self.sentiment['label'] = 'bullish'
-        elif self.sentiment['score'] < -0.2:
-            self.sentiment['label'] = 'bearish'
+        label = _SENTIMENT_LABELS[(score >= -0.2) + (score > 0.2)]
+
+        # Confiance basée sur la cohérence quantique (inchangée si la cohérence bouge peu)
+        coherence = self.quantum['coherence']
+        if self._last_coherence is not None and abs(coherence - self._last_coherence) < 0.5:
+            confidence = self.sentiment['confidence']
         else:
-            self.sentiment['label'] = 'neutral'
+            confidence = 0.6 + (coherence / 100) * 0.4
+            self._last_coherence = coherence
 
-        # Confiance basée sur la cohérence quantique
-        self.sentiment['confidence'] = 0.6 + (self.quantum['coherence'] / 100) * 0.4
+        self.sentiment = {**self.sentiment, 'score': score, 'label': label, 'confidence': confidence}
 
-        self.models['bert_sentiment']['analyses'] += 1
+        self._model_counters[_BERT_SENTIMENT] += 1
 
     def _update_model_performance(self):
         """Met à jour les performances des modèles"""
-        for model_name, model_data in self.models.items():
-            # Simulation d'amélioration continue
-            if random.random() < 0.1:  # 10% chance d'amélioration
-                improvement = random.uniform(0.1, 0.5)
-                model_data['accuracy'] = min(95.0, model_data['accuracy'] + improvement)
+        n = len(_MODEL_NAMES)
+
+        # Simulation d'amélioration continue: 10% de chance par modèle, tirages groupés
+        improve = self._rng.random(n) < 0.1
+        if not improve.any():
+            return
+        improvements = self._rng.uniform(0.1, 0.5, n)
+
+        accuracy = self._model_accuracy
+        self._model_accuracy = np.where(improve, np.minimum(95.0, accuracy + improvements), accuracy)
+
+    @property
+    def models(self):
+        """Vue dict des modèles (format historique de get_ai_status)"""
+        return {
+            name: {'accuracy': accuracy, field: count}
+            for name, field, accuracy, count in zip(_MODEL_NAMES, _MODEL_COUNTER_FIELDS,
+                                                    self._model_accuracy.tolist(),
+                                                    self._model_counters.tolist())
+        }
 
     def should_open_position(self, symbol, current_price=None, market_data=None):
         """L'IA décide s'il faut ouvrir une position (CŒUR DU BOT)"""
@@ -161,23 +224,7 @@ class TradingAI:
             decision = self._make_trading_decision(analysis)
 
             if decision['action'] != 'HOLD':
-                self.decisions_made += 1
-                self.decision_history.append(decision)
-
-                # Log de la décision IA
-                self.logger.info(
-                    f"🧠 IA décision {symbol}: {decision['action']} "
-                    f"(confiance: {decision['confidence']:.2f})"
-                )
-
-                # Log détaillé pour le système de trading
-                log_signal_analysis(
-                    symbol=symbol,
-                    signal_type=decision['action'],
-                    confidence=decision['confidence'],
-                    reasoning=decision['reasoning']
-                )
-
+                self._record_decision(decision)
                 return decision
 
             return None
@@ -186,6 +233,110 @@ class TradingAI:
             self.logger.error(f"❌ Erreur décision IA: {e}")
             return None
 
+    def should_open_positions(self, symbols, prices=None, volumes=None, true_ranges=None):
+        """Décisions IA pour un lot de symboles en une passe vectorisée.
+
+        prices, volumes et true_ranges sont alignés sur symbols (None/NaN = indisponible);
+        true_ranges est le ratio (high - low) / close. Retourne une décision ou None par symbole.
+        """
+        if not self.is_active or not symbols:
+            return [None] * len(symbols)
+
+        try:
+            n = len(symbols)
+            volumes = self._as_array(volumes, n)
+            true_ranges = self._as_array(true_ranges, n)
+
+            # Analyse quantique
+            quantum_scores_ = self.quantum_analysis_batch(symbols, prices)
+
+            # Prédiction ML (LSTM + Random Forest), volume normalisé si disponible
+            lstm_preds, rf_preds = (self._rng.random((2, n)) - 0.5) * 2
+            volume_factors = np.where(np.isnan(volumes), 1.0, np.minimum(2.0, volumes / 1000000))
+            lstm_weight = self._model_accuracy[_LSTM] / 100
+            rf_weight = self._model_accuracy[_RANDOM_FOREST] / 100
+            ml_scores = np.clip(volume_factors * (lstm_preds * lstm_weight + rf_preds * rf_weight) /
+                                (lstm_weight + rf_weight), -1, 1)
+            self._model_counters[_LSTM] += n
+            self._model_counters[_RANDOM_FOREST] += n
+
+            # Analyse technique
+            trend_strengths = (self._rng.random(n) - 0.5) * 2
+            volatility_factors = self._rng.uniform(0.5, 1.5, n) * (1 + np.nan_to_num(true_ranges))
+            technical_scores = np.clip(trend_strengths * volatility_factors * 0.5, -1, 1)
+            self._model_counters[_GBM_VOLATILITY] += n
+
+            sentiment_score = self.sentiment['score']
+            codes, strengths, final_scores = decide_batch(
+                quantum_scores_, ml_scores, sentiment_score, technical_scores,
+                *self._weights, self.sentiment['confidence'])
+
+            # Confiance: cohérence des signaux (variance), sentiment et cohérence quantique
+            signals = np.stack([quantum_scores_, ml_scores,
+                                np.full(n, sentiment_score), technical_scores])
+            confidences = np.clip(0.4 / (1 + signals.var(axis=0)) +
+                                  self.sentiment['confidence'] * 0.3 +
+                                  self.quantum['coherence'] / 100 * 0.3, 0.5, 0.95)
+
+            # Seules les décisions d'action sont matérialisées en dict
+            results = [None] * n
+            timestamp = time.time()
+            for i in np.flatnonzero(codes).tolist():
+                analysis = {
+                    'symbol': symbols[i],
+                    'quantum_score': float(quantum_scores_[i]),
+                    'ml_prediction': float(ml_scores[i]),
+                    'sentiment_score': sentiment_score,
+                    'technical_score': float(technical_scores[i]),
+                    'current_price': prices[i] if prices is not None else None,
+                    'timestamp': timestamp
+                }
+                final_score = float(final_scores[i])
+                decision = {
+                    'symbol': symbols[i],
+                    'action': _ACTIONS[int(codes[i])],
+                    'strength': float(strengths[i]),
+                    'confidence': float(confidences[i]),
+                    'final_score': final_score,
+                    'components': analysis,
+                    'reasoning': self._generate_reasoning(analysis, final_score),
+                    'timestamp': timestamp
+                }
+                self._record_decision(decision)
+                results[i] = decision
+
+            return results
+
+        except Exception as e:
+            self.logger.error(f"❌ Erreur décisions IA par lot: {e}")
+            return [None] * len(symbols)
+
+    @staticmethod
+    def _as_array(values, n):
+        """Liste optionnelle -> tableau float64 (None -> NaN)"""
+        if values is None:
+            return np.full(n, np.nan)
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+    def _record_decision(self, decision):
+        """Enregistre et journalise une décision d'achat/vente"""
+        self.decisions_made += 1
+        self.decision_history.append(decision)
+
+        # Log de la décision IA
+        self.logger.info(
+            f"🧠 IA décision {decision['symbol']}: {decision['action']} "
+            f"(confiance: {decision['confidence']:.2f})"
+        )
+
+        # Log détaillé pour le système de trading
+        log_signal_analysis(
+            symbol=decision['symbol'],
+            signal_type=decision['action'],
+            confidence=decision['confidence'],
+            reasoning=decision['reasoning']
+        )
+
     def _comprehensive_analysis(self, symbol, current_price=None, market_data=None):
         """Analyse complète combinant tous les systèmes IA"""
         # Analyse quantique
@@ -207,33 +358,37 @@ class TradingAI:
             'sentiment_score': sentiment_score,
             'technical_score': technical_score,
             'current_price': current_price,
-            'timestamp': datetime.now()
+            'timestamp': time.time()
         }
 
+    def _symbol_hash(self, symbol):
+        """Empreinte quantique du symbole, calculée une seule fois"""
+        symbol_hash = self._symbol_hash_cache.get(symbol)
+        if symbol_hash is None:
+            symbol_hash = abs(hash(symbol)) % 1000 / 1000
+            self._symbol_hash_cache[symbol] = symbol_hash
+        return symbol_hash
+
     def _quantum_analysis(self, symbol, current_price=None):
         """Analyse quantique spécifique au symbole"""
-        # Empreinte quantique du symbole
-        symbol_hash = abs(hash(symbol)) % 1000 / 1000
-
-        # Calcul quantique composite
-        superposition_factor = (self.quantum['superposition'] - 50) / 50
-        entanglement_factor = (self.quantum['entanglement'] - 50) / 50
-        momentum_factor = (self.quantum['momentum'] - 50) / 50
-
-        # Score quantique final
-        quantum_score = (superposition_factor * 0.4 + 
-                        entanglement_factor * 0.4 + 
-                        momentum_factor * 0.2)
-
-        # Modulation par l'empreinte du symbole
-        quantum_score *= (0.5 + symbol_hash)
-
-        # Intégration du prix si disponible
-        if current_price:
-            price_oscillation = np.sin(current_price * 100) * 0.1
-            quantum_score += price_oscillation
+        return quantum_score(self._symbol_hash(symbol), float(current_price or 0.0),
+                             self.quantum['superposition'],
+                             self.quantum['entanglement'],
+                             self.quantum['momentum'])
+
+    def quantum_analysis_batch(self, symbols, prices=None):
+        """Analyse quantique d'un lot de symboles en un seul appel vectorisé"""
+        hashes = np.fromiter((self._symbol_hash(s) for s in symbols),
+                             dtype=np.float64, count=len(symbols))
+        if prices is None:
+            prices = np.zeros(len(symbols))
+        else:
+            prices = np.array([p or 0.0 for p in prices], dtype=np.float64)
 
-        return max(-1, min(1, quantum_score))
+        return quantum_scores(hashes, prices,
+                              self.quantum['superposition'],
+                              self.quantum['entanglement'],
+                              self.quantum['momentum'])
 
     def _ml_prediction(self, symbol, market_data=None):
         """Prédiction par les modèles ML"""
@@ -248,14 +403,15 @@ class TradingAI:
             rf_pred *= volume_factor
 
         # Pondération par la performance des modèles
-        lstm_weight = self.models['lstm']['accuracy'] / 100
-        rf_weight = self.models['random_forest']['accuracy'] / 100
+        accuracy = self._model_accuracy
+        lstm_weight = accuracy[_LSTM] / 100
+        rf_weight = accuracy[_RANDOM_FOREST] / 100
 
         ml_score = (lstm_pred * lstm_weight + rf_pred * rf_weight) / (lstm_weight + rf_weight)
 
         # Incrément des compteurs
-        self.models['lstm']['predictions'] += 1
-        self.models['random_forest']['signals'] += 1
+        self._model_counters[_LSTM] += 1
+        self._model_counters[_RANDOM_FOREST] += 1
 
         return max(-1, min(1, ml_score))
 
@@ -274,38 +430,17 @@ class TradingAI:
 
         technical_score = trend_strength * volatility_factor * 0.5
 
-        self.models['gbm_volatility']['forecasts'] += 1
+        self._model_counters[_GBM_VOLATILITY] += 1
 
         return max(-1, min(1, technical_score))
 
     def _make_trading_decision(self, analysis):
         """Prend la décision finale de trading (CŒUR DÉCISIONNEL)"""
-        # Pondération des signaux
-        weights = self.ai_config
-
-        # Score composite final
-        final_score = (analysis['quantum_score'] * weights['quantum_weight'] +
-                      analysis['ml_prediction'] * weights['ml_weight'] +
-                      analysis['sentiment_score'] * weights['sentiment_weight'] +
-                      analysis['technical_score'] * weights['technical_weight'])
-
-        # Seuils de décision adaptatifs basés sur la confiance
-        base_threshold = 0.25
-        confidence_adjustment = (1 - self.sentiment['confidence']) * 0.2
-        
-        buy_threshold = base_threshold + confidence_adjustment
-        sell_threshold = -(base_threshold + confidence_adjustment)
-
-        # Décision finale
-        if final_score > buy_threshold:
-            action = 'BUY'
-            strength = min(1.0, final_score * 2)
-        elif final_score < sell_threshold:
-            action = 'SELL'
-            strength = min(1.0, abs(final_score) * 2)
-        else:
-            action = 'HOLD'
-            strength = 0.0
+        action_code, strength, final_score = decide(
+            analysis['quantum_score'], analysis['ml_prediction'],
+            analysis['sentiment_score'], analysis['technical_score'],
+            *self._weights, self.sentiment['confidence'])
+        action = _ACTIONS[int(action_code)]
 
         # Calcul de la confiance
         confidence = self._calculate_decision_confidence(analysis, final_score)
@@ -318,17 +453,20 @@ class TradingAI:
             'final_score': final_score,
             'components': analysis,
             'reasoning': self._generate_reasoning(analysis, final_score),
-            'timestamp': datetime.now()
+            'timestamp': time.time()
         }
 
     def _calculate_decision_confidence(self, analysis, final_score):
         """Calcule la confiance dans la décision"""
         # Confiance basée sur la cohérence des signaux
-        signals = [analysis['quantum_score'], analysis['ml_prediction'], 
-                  analysis['sentiment_score'], analysis['technical_score']]
-
-        # Cohérence = inverse de la variance
-        signal_variance = np.var(signals)
+        q = analysis['quantum_score']
+        ml = analysis['ml_prediction']
+        s = analysis['sentiment_score']
+        t = analysis['technical_score']
+
+        # Cohérence = inverse de la variance (population, comme np.var)
+        m = (q + ml + s + t) * 0.25
+        signal_variance = ((q - m) ** 2 + (ml - m) ** 2 + (s - m) ** 2 + (t - m) ** 2) * 0.25
         coherence_factor = 1 / (1 + signal_variance)
 
         # Confiance du sentiment
@@ -410,6 +548,20 @@ class TradingAI:
         else:
             return price * (1 - profit_distance)
 
+    @staticmethod
+    def _format_ts(ts):
+        """Horodatage epoch -> ISO, calculé seulement à l'export"""
+        return datetime.fromtimestamp(ts).isoformat()
+
+    def _export_decision(self, decision):
+        """Copie d'une décision avec horodatages lisibles"""
+        return {
+            **decision,
+            'components': {**decision['components'],
+                           'timestamp': self._format_ts(decision['components']['timestamp'])},
+            'timestamp': self._format_ts(decision['timestamp'])
+        }
+
     def get_ai_status(self):
         """Retourne le statut complet de l'IA"""
         return {
@@ -418,19 +570,25 @@ class TradingAI:
             'models': self.models,
             'quantum_state': self.quantum,
             'market_sentiment': self.sentiment,
-            'recent_decisions': self.decision_history[-5:] if self.decision_history else [],
+            'recent_decisions': [self._export_decision(d) for d in list(self.decision_history)[-5:]],
             'performance_summary': {
-                'total_analyses': sum(m.get('predictions', 0) + m.get('signals', 0) + 
-                                   m.get('analyses', 0) + m.get('forecasts', 0) for m in self.models.values()),
-                'avg_model_accuracy': sum(m['accuracy'] for m in self.models.values()) / len(self.models),
+                'total_analyses': int(self._model_counters.sum()),
+                'avg_model_accuracy': float(self._model_accuracy.mean()),
                 'quantum_coherence': self.quantum['coherence'],
                 'sentiment_confidence': self.sentiment['confidence']
             },
             'config': self.ai_config
         }
 
+    def _refresh_weights(self):
+        """Fige les pondérations des signaux (relues seulement au changement de config)"""
+        config = self.ai_config
+        self._weights = (float(config['quantum_weight']), float(config['ml_weight']),
+                         float(config['sentiment_weight']), float(config['technical_weight']))
+
     def update_ai_config(self, new_config):
         """Met à jour la configuration de l'IA"""
         if new_config:
             self.ai_config.update(new_config)
+            self._refresh_weights()
             self.logger.info(f"🧠 Configuration IA mise à jour: {new_config}")
@@ -10,7 +10,6 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.api_config import TRADING_MODES
-import ccxt
 
 def analyze_portfolio():
     print("📊 ANALYSE PERSONNALISÉE DE VOTRE PORTEFEUILLE")
@@ -35,10 +34,12 @@ def analyze_portfolio():
     print()
     
     print("🎯 RÉPARTITION ACTUELLE:")
-    for crypto, value in sorted(portfolio.items(), key=lambda x: x[1], reverse=True):
-        percentage = (value / total) * 100
-        if value > 0:
-            print(f"   {crypto:>6}: ${value:>5.2f} ({percentage:>5.1f}%)")
+    # Positions non nulles triées une fois, pourcentage via un facteur commun
+    scale = 100.0 / total if total else 0.0
+    holdings = sorted(((crypto, value) for crypto, value in portfolio.items() if value > 0),
+                      key=lambda x: x[1], reverse=True)
+    for crypto, value in holdings:
+        print(f"   {crypto:>6}: ${value:>5.2f} ({value * scale:>5.1f}%)")
     print()
     
     print("📈 MES RECOMMANDATIONS POUR VOTRE PORTEFEUILLE:")
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Indicateurs techniques du bot compilés à l'avance
+python -m bot._compile_indicators  ->  bot/indicator_kernels*.so
+"""
+
+import os
+
+from ai._compile_kernels import compile_kernels
+from bot._indicators_njit import _rsi, _macd, _bbands, _all_indicators
+
+INDICATOR_SIGNATURES = {
+    '_rsi': (_rsi, 'f8(f8[:], i8)'),
+    '_macd': (_macd, 'Tuple((f8, f8, i8))(f8[:], i8, i8, i8)'),
+    '_bbands': (_bbands, 'Tuple((f8, f8, f8, i8))(f8[:], i8, f8)'),
+    '_all_indicators': (_all_indicators,
+                        'Tuple((f8, f8, f8, i8, f8, f8, i8))(f8[:], i8, i8, i8, i8, i8, f8)'),
+}
+
+if __name__ == "__main__":
+    output_dir = compile_kernels('indicator_kernels', os.path.dirname(os.path.abspath(__file__)),
+                                 INDICATOR_SIGNATURES)
+    print(f"✅ Indicateurs compilés dans {output_dir}")
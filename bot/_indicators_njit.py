@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Indicateurs techniques sur tableaux NumPy bruts
+Boucles simples compilées par Numba quand il est installé
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Repli sans Numba: les fonctions restent en Python"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _rsi(close, period):
+    """RSI (moyennes simples des gains/pertes sur `period` variations), 50 si indéfini"""
+    n = close.shape[0]
+    gain = 0.0
+    loss = 0.0
+    for i in range(n - period, n):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            gain += delta
+        else:
+            loss -= delta
+
+    if loss == 0.0:
+        return 50.0 if gain == 0.0 else 100.0
+    return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+@njit(cache=True)
+def _macd(close, fast, slow, signal):
+    """MACD en une passe (EWM ajustées comme pandas): (macd, signal, tendance +1/-1/0)"""
+    decay_fast = 1.0 - 2.0 / (fast + 1.0)
+    decay_slow = 1.0 - 2.0 / (slow + 1.0)
+    decay_signal = 1.0 - 2.0 / (signal + 1.0)
+
+    num_fast = num_slow = num_signal = 0.0
+    den_fast = den_slow = den_signal = 0.0
+    macd = signal_value = 0.0
+    for i in range(close.shape[0]):
+        price = close[i]
+        num_fast = price + decay_fast * num_fast
+        den_fast = 1.0 + decay_fast * den_fast
+        num_slow = price + decay_slow * num_slow
+        den_slow = 1.0 + decay_slow * den_slow
+
+        macd = num_fast / den_fast - num_slow / den_slow
+        num_signal = macd + decay_signal * num_signal
+        den_signal = 1.0 + decay_signal * den_signal
+        signal_value = num_signal / den_signal
+
+    if macd > signal_value:
+        trend = 1
+    elif macd < signal_value:
+        trend = -1
+    else:
+        trend = 0
+    return macd, signal_value, trend
+
+
+@njit(cache=True)
+def _bbands(close, period, k):
+    """Bandes de Bollinger sur la dernière fenêtre: (prix, haute, basse, signal +1/-1/0)"""
+    n = close.shape[0]
+    total = 0.0
+    for i in range(n - period, n):
+        total += close[i]
+    mean = total / period
+
+    # Écart-type échantillon (ddof=1) comme rolling().std()
+    sq = 0.0
+    for i in range(n - period, n):
+        diff = close[i] - mean
+        sq += diff * diff
+    std = math.sqrt(sq / (period - 1)) if period > 1 else math.nan
+
+    price = close[n - 1]
+    if math.isnan(std):
+        upper = price * 1.02
+        lower = price * 0.98
+    else:
+        upper = mean + std * k
+        lower = mean - std * k
+
+    if price <= lower:
+        signal = 1
+    elif price >= upper:
+        signal = -1
+    else:
+        signal = 0
+    return price, upper, lower, signal
+
+
+@njit(cache=True)
+def _all_indicators(close, rsi_period, fast, slow, signal, bb_period, k):
+    """RSI + MACD + Bollinger en une seule passe sur `close`.
+
+    Retourne (rsi, macd, macd_signal, macd_trend, bb_upper, bb_lower, bb_signal),
+    avec les mêmes valeurs neutres que les noyaux séparés si l'historique est trop court.
+    """
+    n = close.shape[0]
+    decay_fast = 1.0 - 2.0 / (fast + 1.0)
+    decay_slow = 1.0 - 2.0 / (slow + 1.0)
+    decay_signal = 1.0 - 2.0 / (signal + 1.0)
+    rsi_start = n - rsi_period
+    bb_start = n - bb_period
+
+    num_fast = num_slow = num_signal = 0.0
+    den_fast = den_slow = den_signal = 0.0
+    macd = macd_signal = 0.0
+    gain = loss = 0.0
+    bb_count = 0
+    bb_mean = bb_m2 = 0.0
+
+    for i in range(n):
+        price = close[i]
+
+        # MACD: EWM ajustées rapide, lente, puis signal sur leur écart
+        num_fast = price + decay_fast * num_fast
+        den_fast = 1.0 + decay_fast * den_fast
+        num_slow = price + decay_slow * num_slow
+        den_slow = 1.0 + decay_slow * den_slow
+        macd = num_fast / den_fast - num_slow / den_slow
+        num_signal = macd + decay_signal * num_signal
+        den_signal = 1.0 + decay_signal * den_signal
+        macd_signal = num_signal / den_signal
+
+        # RSI: gains/pertes des `rsi_period` dernières variations
+        if i >= rsi_start and i >= 1:
+            delta = price - close[i - 1]
+            if delta > 0:
+                gain += delta
+            else:
+                loss -= delta
+
+        # Bollinger: moyenne/variance (Welford) de la dernière fenêtre
+        if i >= bb_start:
+            bb_count += 1
+            diff = price - bb_mean
+            bb_mean += diff / bb_count
+            bb_m2 += diff * (price - bb_mean)
+
+    if n < rsi_period + 1:
+        rsi = 50.0
+    elif loss == 0.0:
+        rsi = 50.0 if gain == 0.0 else 100.0
+    else:
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+
+    if n < slow + signal:
+        macd = macd_signal = 0.0
+        macd_trend = 0
+    elif macd > macd_signal:
+        macd_trend = 1
+    elif macd < macd_signal:
+        macd_trend = -1
+    else:
+        macd_trend = 0
+
+    price = close[n - 1]
+    if n < bb_period:
+        return rsi, macd, macd_signal, macd_trend, 0.0, 0.0, 0
+    if bb_period > 1:
+        std = math.sqrt(bb_m2 / (bb_period - 1))
+        bb_upper = bb_mean + std * k
+        bb_lower = bb_mean - std * k
+    else:
+        bb_upper = price * 1.02
+        bb_lower = price * 0.98
+    if price <= bb_lower:
+        bb_signal = 1
+    elif price >= bb_upper:
+        bb_signal = -1
+    else:
+        bb_signal = 0
+
+    return rsi, macd, macd_signal, macd_trend, bb_upper, bb_lower, bb_signal
+
+
+def warm_up():
+    """Compile (ou charge du cache) les noyaux une fois, au démarrage du bot"""
+    dummy = np.linspace(100.0, 110.0, 60)
+    _rsi(dummy, 14)
+    _macd(dummy, 12, 26, 9)
+    _bbands(dummy, 20, 2.0)
+    _all_indicators(dummy, 14, 12, 26, 9, 20, 2.0)
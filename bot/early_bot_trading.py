@@ -10,10 +10,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import ccxt
-import pandas as pd
 import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
 import time
 import threading
+import queue
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import json
 from flask import Flask, render_template_string, request, jsonify
@@ -28,6 +32,15 @@ from logging_system import (setup_logging, get_logger, log_portfolio_update,
 # Import du moteur IA Quantique
 from ai.quantum_ai_engine import TradingAI
 
+# Noyaux d'indicateurs techniques
+try:
+    # Noyaux précompilés (python -m bot._compile_indicators): pas de compilation au démarrage
+    from bot.indicator_kernels import _rsi, _macd, _bbands, _all_indicators
+    INDICATORS_AOT = True
+except ImportError:
+    from bot._indicators_njit import _rsi, _macd, _bbands, _all_indicators, warm_up as warm_up_indicators
+    INDICATORS_AOT = False
+
 # Import du template IA
 from templates.ai_dashboard import HTML_TEMPLATE_AI
 from templates.new_dashboard import NEW_DASHBOARD_TEMPLATE
@@ -50,6 +63,30 @@ except ImportError:
     print("⚠️ Fonctionnalités avancées non disponibles")
     ENHANCED_FEATURES = False
 
+# Colonnes des tableaux OHLCV renvoyés par get_market_data
+OHLCV_TIMESTAMP, OHLCV_OPEN, OHLCV_HIGH, OHLCV_LOW, OHLCV_CLOSE, OHLCV_VOLUME = range(6)
+
+# Cache des bougies conservé entre deux lancements
+OHLCV_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.earlybot', 'ohlcv_cache.npz')
+
+# Nombre de cycles entre deux sauvegardes du cache OHLCV
+OHLCV_CACHE_SAVE_EVERY = 10
+
+# Devises valorisées 1:1 en USD
+USD_STABLECOINS = ('USD', 'USDC', 'PYUSD')
+
+# Durée de réutilisation des prix du portfolio entre deux cycles (secondes)
+TICKER_CACHE_TTL = 30
+
+# Lignes console en attente avant d'abandonner les plus anciennes
+LOG_QUEUE_SIZE = 10000
+
+# Marqueur de fin pour le thread d'écriture console
+_LOG_STOP = object()
+
+# Codes de tendance des noyaux d'indicateurs (+1/-1/0) -> signal
+TREND_LABELS = {1: 'BUY', -1: 'SELL', 0: 'HOLD'}
+
 class EarlyBotTrading:
     def __init__(self):
         # Initialiser le système de logging
@@ -73,6 +110,24 @@ class EarlyBotTrading:
         self.portfolio_details = {}
         self.current_positions = {}
         self.current_mode = 'normal'
+        self._refresh_indicator_params()
+        
+        # Prix USD du portfolio: (horodatage, devises, prix)
+        self._ticker_cache = (0.0, frozenset(), {})
+        
+        # Bougies déjà reçues par (symbole, timeframe): seules les nouvelles sont redemandées
+        self._ohlcv_cache = self._load_ohlcv_cache()
+        self._ohlcv_save_lock = threading.Lock()
+        atexit.register(self._save_ohlcv_cache)
+        
+        # Pool d'E/S: les OHLCV de tous les symboles sont récupérés en parallèle
+        self._io_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='market-data')
+        
+        # Sortie console de la boucle de trading écrite par un thread dédié
+        self._logq = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._log_thread = None
+        self._start_log_drain()
+        atexit.register(self._stop_log_drain)
         
         # Initialisation des fonctionnalités avancées
         if ENHANCED_FEATURES:
@@ -91,6 +146,10 @@ class EarlyBotTrading:
         self.logger.info("📊 Configuration chargée")
         self.logger.info(f"🎯 Certification: {self.api_config.get('certification_id', 'N/A')}")
         
+        # Compilation JIT des indicateurs payée une fois, pas au premier cycle
+        if not INDICATORS_AOT:
+            warm_up_indicators()
+        
         print("🔐 Configuration Early-Bot-Trading avec modes de trading...")
         self.setup_exchange()
         
@@ -112,6 +171,12 @@ class EarlyBotTrading:
                 }
             })
             
+            # Session keep-alive partagée: une connexion TLS réutilisée par thread du pool d'E/S
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=1))
+            self.exchange.session = session
+            self._serialize_throttle(self.exchange)
+            
             self.logger.info("🔐 Configuration CCXT terminée")
             
             # Test de connexion avec les nouvelles clés
@@ -166,103 +231,234 @@ class EarlyBotTrading:
             print("💡 Suggestion: Vérifiez que les clés CDP sont correctes")
             return False
     
+    def _p(self, msg):
+        """Affiche une ligne sans bloquer l'appelant (la plus ancienne est abandonnée si la file est pleine)"""
+        if self._log_thread is None or not self._log_thread.is_alive():
+            print(msg)
+            return
+        try:
+            self._logq.put_nowait(msg)
+        except queue.Full:
+            try:
+                # Le marqueur de fin n'est jamais abandonné
+                dropped = self._logq.get_nowait()
+                self._logq.put_nowait(_LOG_STOP if dropped is _LOG_STOP else msg)
+            except (queue.Empty, queue.Full):
+                pass
+    
+    def _start_log_drain(self):
+        """Démarre le thread d'écriture console s'il ne tourne pas déjà"""
+        if self._log_thread is None or not self._log_thread.is_alive():
+            self._log_thread = threading.Thread(target=self._log_drainer, name='log-drain', daemon=True)
+            self._log_thread.start()
+    
+    def _stop_log_drain(self, timeout=5.0):
+        """Écrit les lignes encore en file puis arrête le thread d'écriture"""
+        thread = self._log_thread
+        if thread is None or not thread.is_alive():
+            return
+        self._logq.put(_LOG_STOP)
+        thread.join(timeout)
+    
+    def _log_drainer(self):
+        """Écrit les lignes en attente sur stdout par lots, jusqu'au marqueur de fin"""
+        while True:
+            lines = [self._logq.get()]
+            try:
+                while True:
+                    lines.append(self._logq.get_nowait())
+            except queue.Empty:
+                pass
+            stop = any(line is _LOG_STOP for line in lines)
+            if stop:
+                lines = [line for line in lines if line is not _LOG_STOP]
+            try:
+                if lines:
+                    sys.stdout.write('\n'.join(map(str, lines)) + '\n')
+                sys.stdout.flush()
+            except Exception:
+                pass
+            if stop:
+                return
+    
+    def _refresh_indicator_params(self):
+        """Copie les paramètres des indicateurs depuis la config (à rappeler après un changement de mode)"""
+        config = self.config
+        self._indicator_args = (
+            int(config['rsi_period']),
+            int(config['macd_fast']),
+            int(config['macd_slow']),
+            int(config['macd_signal']),
+            int(config['bollinger_period']),
+            float(config['bollinger_std'])
+        )
+        self._rsi_lo = config['rsi_oversold']
+        self._rsi_hi = config['rsi_overbought']
+    
     def get_portfolio_balance(self):
         """Obtenir le solde complet du portfolio avec tous les assets"""
         try:
             balance = self.exchange.fetch_balance()
             
-            # Calculer la valeur totale en USD
-            total_usd = 0.0
-            portfolio_details = {}
+            self._p("💰 PORTFOLIO COMPLET:")
+            self._p("-" * 40)
             
-            print("💰 PORTFOLIO COMPLET:")
-            print("-" * 40)
+            totals = balance.get('total') or {}
+            free_amounts = balance.get('free') or {}
+            used_amounts = balance.get('used') or {}
+            holdings = {currency: total for currency, total in totals.items() if total and total > 0}
             
-            for currency, amounts in balance.items():
-                if currency not in ['info', 'free', 'used', 'total'] and amounts.get('total', 0) > 0:
-                    total = amounts.get('total', 0)
-                    free = amounts.get('free', 0)
-                    used = amounts.get('used', 0)
-                    
-                    # Essayer de convertir en USD/USDC
-                    usd_value = 0.0
-                    if currency in ['USD', 'USDC', 'PYUSD']:
-                        usd_value = total
-                    else:
-                        try:
-                            # Priorité aux paires USDC pour compatibilité
-                            ticker_symbol = f"{currency}/USDC"
-                            ticker = self.exchange.fetch_ticker(ticker_symbol)
-                            usd_value = total * ticker['last']
-                        except:
-                            try:
-                                # Fallback vers USD si USDC n'existe pas
-                                ticker_symbol = f"{currency}/USD"
-                                ticker = self.exchange.fetch_ticker(ticker_symbol)
-                                usd_value = total * ticker['last']
-                            except:
-                                # Si pas de pair USD/USDC directe, essayer avec BTC
-                                try:
-                                    btc_symbol = f"{currency}/BTC"
-                                    btc_ticker = self.exchange.fetch_ticker(btc_symbol)
-                                    btc_usdc_ticker = self.exchange.fetch_ticker("BTC/USDC")
-                                    usd_value = total * btc_ticker['last'] * btc_usdc_ticker['last']
-                                except:
-                                    usd_value = 0  # Impossible de convertir
-                    
-                    if total > 0:
-                        portfolio_details[currency] = {
-                            'total': total,
-                            'free': free,
-                            'used': used,
-                            'usd_value': usd_value
-                        }
-                        total_usd += usd_value
-                        
-                        print(f"  {currency}: {total:.8f} (${usd_value:.2f})")
+            # Tous les prix en une requête (réutilisés pendant TICKER_CACHE_TTL)
+            usd_prices = self._get_usd_prices(holdings)
+            
+            # Calculer la valeur totale en USD: quantités et prix alignés, un seul produit
+            currencies = list(holdings)
+            amounts = np.fromiter(holdings.values(), dtype=np.float64, count=len(currencies))
+            prices = np.fromiter((usd_prices.get(c, 0.0) for c in currencies),
+                                 dtype=np.float64, count=len(currencies))
+            usd_values = amounts * prices
+            total_usd = float(usd_values.sum())
             
-            print("-" * 40)
-            print(f"💰 TOTAL: ${total_usd:.2f}")
-            print("-" * 40)
+            portfolio_details = {
+                currency: {
+                    'total': total,
+                    'free': free_amounts.get(currency, 0),
+                    'used': used_amounts.get(currency, 0),
+                    'usd_value': usd_value
+                }
+                for currency, total, usd_value in zip(currencies, amounts.tolist(), usd_values.tolist())
+            }
+            
+            for currency, details in portfolio_details.items():
+                self._p(f"  {currency}: {details['total']:.8f} (${details['usd_value']:.2f})")
+            
+            self._p("-" * 40)
+            self._p(f"💰 TOTAL: ${total_usd:.2f}")
+            self._p("-" * 40)
             
             self.portfolio_balance = total_usd
             self.portfolio_details = portfolio_details
             return total_usd
             
         except Exception as e:
-            print(f"❌ Erreur récupération portfolio: {e}")
+            self._p(f"❌ Erreur récupération portfolio: {e}")
             return 0.0
     
+    def _get_usd_prices(self, currencies):
+        """Prix USD par devise via un seul fetch_tickers (USDC, puis USD, puis via BTC)"""
+        key = frozenset(currencies)
+        cached_at, cached_key, cached_prices = self._ticker_cache
+        if cached_key == key and time.time() - cached_at < TICKER_CACHE_TTL:
+            return cached_prices
+        
+        markets = self.exchange.load_markets()
+        to_price = [c for c in currencies if c not in USD_STABLECOINS]
+        wanted = [symbol for c in to_price for symbol in (f"{c}/USDC", f"{c}/USD", f"{c}/BTC")
+                  if symbol in markets]
+        if 'BTC/USDC' in markets:
+            wanted.append('BTC/USDC')
+        
+        tickers = {}
+        if wanted:
+            try:
+                tickers = self.exchange.fetch_tickers(list(dict.fromkeys(wanted)))
+            except Exception as e:
+                self._p(f"⚠️ Erreur récupération des prix: {e}")
+        
+        def last(symbol):
+            return (tickers.get(symbol) or {}).get('last')
+        
+        btc_usdc = last('BTC/USDC')
+        prices = {c: 1.0 for c in currencies if c in USD_STABLECOINS}
+        for currency in to_price:
+            price = last(f"{currency}/USDC") or last(f"{currency}/USD")
+            if price is None:
+                # Si pas de paire USD/USDC directe, conversion via BTC
+                btc_price = last(f"{currency}/BTC")
+                price = btc_price * btc_usdc if btc_price and btc_usdc else 0.0
+            prices[currency] = price
+        
+        if tickers or not wanted:
+            self._ticker_cache = (time.time(), key, prices)
+        return prices
+    
+    def _serialize_throttle(self, exchange):
+        """Rate limiter CCXT partagé sans course entre les threads du pool d'E/S"""
+        # throttle lit lastRestRequestTimestamp et fetch2 ne l'écrit qu'après: sans verrou, 8 threads
+        # voient le même horodatage et partent ensemble. Un client par thread multiplierait le débit.
+        lock = threading.Lock()
+        throttle = exchange.throttle
+        
+        def locked_throttle(cost=None):
+            with lock:
+                throttle(cost)
+                exchange.lastRestRequestTimestamp = exchange.milliseconds()
+        
+        exchange.throttle = locked_throttle
+    
     def get_market_data(self, symbol, timeframe='1h', limit=100):
-        """Récupérer les données de marché avec gestion d'erreur améliorée"""
+        """Récupérer les données de marché (tableau float64 n x 6, colonnes OHLCV_*)"""
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            if not ohlcv or len(ohlcv) < 50:
-                print(f"⚠️ Données insuffisantes pour {symbol}")
+            key = (symbol, timeframe)
+            cached = self._ohlcv_cache.get(key)
+            timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+            
+            if cached is not None and time.time() * 1000 - cached[-1, OHLCV_TIMESTAMP] < limit * timeframe_ms:
+                # Seules les bougies depuis la dernière connue (peut-être inachevée) sont demandées
+                last_ts = cached[-1, OHLCV_TIMESTAMP]
+                new_bars = self.exchange.fetch_ohlcv(symbol, timeframe, since=int(last_ts), limit=limit)
+                if new_bars:
+                    new_bars = np.asarray(new_bars, dtype=np.float64)
+                    kept = cached[cached[:, OHLCV_TIMESTAMP] < new_bars[0, OHLCV_TIMESTAMP]]
+                    data = np.concatenate((kept, new_bars))[-limit:]
+                else:
+                    data = cached
+            else:
+                ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+                data = np.asarray(ohlcv, dtype=np.float64) if ohlcv else None
+            
+            if data is None or len(data) < 50:
+                self._p(f"⚠️ Données insuffisantes pour {symbol}")
                 return None
-                
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            return df
+            
+            self._ohlcv_cache[key] = data
+            return data
         except Exception as e:
-            print(f"❌ Erreur données {symbol}: {e}")
+            self._p(f"❌ Erreur données {symbol}: {e}")
             return None
     
+    def _load_ohlcv_cache(self):
+        """Recharge les bougies sauvegardées au dernier arrêt ({(symbole, timeframe): tableau})"""
+        try:
+            with np.load(OHLCV_CACHE_FILE) as saved:
+                return {tuple(name.rsplit('|', 1)): saved[name] for name in saved.files}
+        except Exception:
+            return {}
+    
+    def _save_ohlcv_cache(self):
+        """Sauvegarde les bougies en cache pour le prochain démarrage (fichier temporaire puis os.replace)"""
+        tmp_file = OHLCV_CACHE_FILE + '.tmp'
+        try:
+            with self._ohlcv_save_lock:
+                os.makedirs(os.path.dirname(OHLCV_CACHE_FILE), exist_ok=True)
+                arrays = {f"{symbol}|{timeframe}": data
+                          for (symbol, timeframe), data in list(self._ohlcv_cache.items())}
+                # Objet fichier: np.savez n'ajoute pas d'extension .npz au nom temporaire
+                with open(tmp_file, 'wb') as f:
+                    np.savez(f, **arrays)
+                os.replace(tmp_file, OHLCV_CACHE_FILE)
+        except Exception as e:
+            self._p(f"⚠️ Erreur sauvegarde cache OHLCV: {e}")
+    
     def calculate_rsi(self, prices, period=14):
         """Calcul RSI avec protection contre les erreurs"""
         try:
             if len(prices) < period + 1:
                 return 50  # Valeur neutre si pas assez de données
                 
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50
+            return _rsi(np.asarray(prices, dtype=np.float64), period)
         except Exception as e:
-            print(f"❌ Erreur calcul RSI: {e}")
+            self._p(f"❌ Erreur calcul RSI: {e}")
             return 50
     
     def calculate_macd(self, prices, fast=12, slow=26, signal=9):
@@ -271,114 +467,72 @@ class EarlyBotTrading:
             if len(prices) < slow + signal:
                 return 0, 0, 'HOLD'
                 
-            exp1 = prices.ewm(span=fast).mean()
-            exp2 = prices.ewm(span=slow).mean()
-            macd_line = exp1 - exp2
-            signal_line = macd_line.ewm(span=signal).mean()
-            histogram = macd_line - signal_line
-            
-            current_macd = macd_line.iloc[-1] if not pd.isna(macd_line.iloc[-1]) else 0
-            current_signal = signal_line.iloc[-1] if not pd.isna(signal_line.iloc[-1]) else 0
-            
-            if current_macd > current_signal:
-                trend = 'BUY'
-            elif current_macd < current_signal:
-                trend = 'SELL'
-            else:
-                trend = 'HOLD'
-                
-            return current_macd, current_signal, trend
+            current_macd, current_signal, trend = _macd(np.asarray(prices, dtype=np.float64), fast, slow, signal)
+            return current_macd, current_signal, TREND_LABELS[trend]
         except Exception as e:
-            print(f"❌ Erreur calcul MACD: {e}")
+            self._p(f"❌ Erreur calcul MACD: {e}")
             return 0, 0, 'HOLD'
     
     def calculate_bollinger_bands(self, prices, period=20, std_dev=2):
         """Calcul Bollinger Bands avec protection"""
         try:
-            if len(prices) < period:
-                return prices.iloc[-1] if len(prices) > 0 else 0, 0, 0, 'HOLD'
+            close = np.asarray(prices, dtype=np.float64)
+            if len(close) < period:
+                return close[-1] if len(close) > 0 else 0, 0, 0, 'HOLD'
                 
-            rolling_mean = prices.rolling(window=period).mean()
-            rolling_std = prices.rolling(window=period).std()
-            upper_band = rolling_mean + (rolling_std * std_dev)
-            lower_band = rolling_mean - (rolling_std * std_dev)
-            
-            current_price = prices.iloc[-1]
-            current_upper = upper_band.iloc[-1] if not pd.isna(upper_band.iloc[-1]) else current_price * 1.02
-            current_lower = lower_band.iloc[-1] if not pd.isna(lower_band.iloc[-1]) else current_price * 0.98
-            current_middle = rolling_mean.iloc[-1] if not pd.isna(rolling_mean.iloc[-1]) else current_price
-            
-            if current_price <= current_lower:
-                signal = 'BUY'
-            elif current_price >= current_upper:
-                signal = 'SELL'
-            else:
-                signal = 'HOLD'
-                
-            return current_price, current_upper, current_lower, signal
+            current_price, current_upper, current_lower, signal = _bbands(close, period, float(std_dev))
+            return current_price, current_upper, current_lower, TREND_LABELS[signal]
         except Exception as e:
-            print(f"❌ Erreur calcul Bollinger: {e}")
+            self._p(f"❌ Erreur calcul Bollinger: {e}")
             return 0, 0, 0, 'HOLD'
     
-    def analyze_symbol(self, symbol):
-        """Analyse technique complète d'un symbole"""
+    def analyze_symbol(self, symbol, ohlcv=None):
+        """Analyse technique complète d'un symbole (ohlcv: données déjà récupérées)"""
         try:
-            print(f"📈 Analyse {symbol}...")
+            self._p(f"📈 Analyse {symbol}...")
             
             # Récupération des données
-            df = self.get_market_data(symbol)
-            if df is None or len(df) < 50:
+            if ohlcv is None:
+                ohlcv = self.get_market_data(symbol)
+            if ohlcv is None or len(ohlcv) < 50:
                 return self.create_signal(symbol, 'HOLD', 0, "Données insuffisantes")
             
-            prices = df['close']
-            current_price = prices.iloc[-1]
+            prices = np.ascontiguousarray(ohlcv[:, OHLCV_CLOSE])
+            current_price = prices[-1]
             
-            # Indicateurs techniques
-            rsi = self.calculate_rsi(prices, self.config['rsi_period'])
-            macd, macd_signal, macd_trend = self.calculate_macd(
-                prices, 
-                self.config['macd_fast'], 
-                self.config['macd_slow'], 
-                self.config['macd_signal']
-            )
-            price, bb_upper, bb_lower, bb_signal = self.calculate_bollinger_bands(
-                prices, 
-                self.config['bollinger_period'], 
-                self.config['bollinger_std']
+            # Indicateurs techniques: RSI, MACD et Bollinger en une seule passe
+            rsi, macd, macd_signal, macd_code, bb_upper, bb_lower, bb_code = _all_indicators(
+                prices, *self._indicator_args
             )
             
-            # Logique de trading
-            signals = []
-            signal_strength = 0
+            # Logique de trading: votes et force cumulés en entiers
+            buy_count = sell_count = signal_strength = 0
             
             # RSI
-            if rsi < self.config['rsi_oversold']:
-                signals.append('BUY')
+            if rsi < self._rsi_lo:
+                buy_count += 1
                 signal_strength += 30
-            elif rsi > self.config['rsi_overbought']:
-                signals.append('SELL')
+            elif rsi > self._rsi_hi:
+                sell_count += 1
                 signal_strength += 30
             
             # MACD
-            if macd_trend == 'BUY':
-                signals.append('BUY')
+            if macd_code == 1:
+                buy_count += 1
                 signal_strength += 25
-            elif macd_trend == 'SELL':
-                signals.append('SELL')
+            elif macd_code == -1:
+                sell_count += 1
                 signal_strength += 25
             
             # Bollinger Bands
-            if bb_signal == 'BUY':
-                signals.append('BUY')
+            if bb_code == 1:
+                buy_count += 1
                 signal_strength += 20
-            elif bb_signal == 'SELL':
-                signals.append('SELL')
+            elif bb_code == -1:
+                sell_count += 1
                 signal_strength += 20
             
             # Décision finale
-            buy_count = signals.count('BUY')
-            sell_count = signals.count('SELL')
-            
             if buy_count > sell_count and signal_strength >= 20:
                 final_signal = 'BUY'
             elif sell_count > buy_count and signal_strength >= 20:
@@ -386,7 +540,7 @@ class EarlyBotTrading:
             else:
                 final_signal = 'HOLD'
             
-            reason = f"RSI:{rsi:.1f} MACD:{macd_trend} BB:{bb_signal} Force:{signal_strength}"
+            reason = f"RSI:{rsi:.1f} MACD:{TREND_LABELS[macd_code]} BB:{TREND_LABELS[bb_code]} Force:{signal_strength}"
             
             return self.create_signal(symbol, final_signal, signal_strength, reason, {
                 'price': current_price,
@@ -399,7 +553,7 @@ class EarlyBotTrading:
             
         except Exception as e:
             error_msg = f"Erreur: {str(e)}"
-            print(f"❌ Erreur analyse {symbol}: {error_msg}")
+            self._p(f"❌ Erreur analyse {symbol}: {error_msg}")
             return self.create_signal(symbol, 'HOLD', 0, error_msg)
     
     def create_signal(self, symbol, signal, strength, reason, details=None):
@@ -409,10 +563,19 @@ class EarlyBotTrading:
             'signal': signal,
             'strength': strength,
             'reason': reason,
-            'timestamp': datetime.now().isoformat(),
+            'ts_ns': time.time_ns(),
             'details': details or {}
         }
     
+    def export_signals(self):
+        """Derniers signaux avec horodatage ISO, calculé seulement à l'export"""
+        exported = {}
+        for symbol, signal in list(self.signals.items()):
+            signal = dict(signal)
+            signal['timestamp'] = datetime.fromtimestamp(signal.pop('ts_ns') / 1e9).isoformat()
+            exported[symbol] = signal
+        return exported
+    
     def execute_trade(self, signal):
         """Exécuter un vrai trade sur Coinbase avec intégration IA"""
         if not self.is_trading or signal['signal'] == 'HOLD':
@@ -439,41 +602,41 @@ class EarlyBotTrading:
                     crypto_value_usd, 
                     self.config['max_position_size']
                 )
-                print(f"🧠 IA calcul position: ${position_size:.2f} (confiance: {ai_decision['confidence']:.2f})")
+                self._p(f"🧠 IA calcul position: ${position_size:.2f} (confiance: {ai_decision['confidence']:.2f})")
             else:
                 # Calcul classique basé sur la crypto individuelle
                 position_size = crypto_value_usd * self.config['max_position_size']
             
-            print(f"💡 DEBUG: {base_currency}: {crypto_balance:.8f} (~${crypto_value_usd:.2f}) → Position: ${position_size:.2f}")
-            print(f"💡 Minimum requis: ${self.config['min_trade_amount']:.2f}")
+            self._p(f"💡 DEBUG: {base_currency}: {crypto_balance:.8f} (~${crypto_value_usd:.2f}) → Position: ${position_size:.2f}")
+            self._p(f"💡 Minimum requis: ${self.config['min_trade_amount']:.2f}")
             
             # Si la position calculée est trop petite, utilisons le minimum ou 50% de la balance
             if position_size < self.config['min_trade_amount']:
                 position_size = min(self.config['min_trade_amount'], crypto_value_usd * 0.5)
-                print(f"⚡ Position ajustée: ${position_size:.2f}")
+                self._p(f"⚡ Position ajustée: ${position_size:.2f}")
             
             # Vérifier qu'on ne dépasse pas 80% de la balance de cette crypto
             max_safe_position = crypto_value_usd * 0.8
             if position_size > max_safe_position:
                 position_size = max_safe_position
-                print(f"⚙️ Position limitée à 80% de {base_currency}: ${position_size:.2f}")
+                self._p(f"⚙️ Position limitée à 80% de {base_currency}: ${position_size:.2f}")
             
             # Si même après ajustement c'est trop petit, skip
             if position_size < 0.01:
-                print(f"❌ Position trop petite après ajustement: ${position_size:.4f}")
+                self._p(f"❌ Position trop petite après ajustement: ${position_size:.4f}")
                 return False
             
             # Obtenir le prix actuel
             price = signal['details'].get('price', 0)
             if price <= 0:
-                print(f"❌ Prix invalide pour {symbol}")
+                self._p(f"❌ Prix invalide pour {symbol}")
                 return False
 
             try:
                 if action == 'BUY':
                     # Achat réel
                     quantity = position_size / price
-                    print(f"💰 TENTATIVE ACHAT RÉEL: {quantity:.8f} {base_currency} de {symbol} à ${price:.2f} (${position_size:.2f})")
+                    self._p(f"💰 TENTATIVE ACHAT RÉEL: {quantity:.8f} {base_currency} de {symbol} à ${price:.2f} (${position_size:.2f})")
                     
                     # Déterminer quelle devise de base utiliser selon la paire
                     if '/PYUSD' in symbol:
@@ -486,7 +649,7 @@ class EarlyBotTrading:
                         quote_currency = 'USD'
                         quote_balance = balance.get('USD', {}).get('free', 0)
                     
-                    print(f"💡 Balance {quote_currency}: ${quote_balance:.6f}")
+                    self._p(f"💡 Balance {quote_currency}: ${quote_balance:.6f}")
                     
                     if quote_balance >= position_size:
                         # Exécuter l'ordre d'achat
@@ -494,29 +657,29 @@ class EarlyBotTrading:
                             order_params = {}
                             if quote_currency in self.accounts:
                                 order_params['account_id'] = self.accounts[quote_currency]
-                                print(f"💡 Utilisation account_id pour {quote_currency}: {self.accounts[quote_currency][:12]}...")
+                                self._p(f"💡 Utilisation account_id pour {quote_currency}: {self.accounts[quote_currency][:12]}...")
                             
                             order = self.exchange.create_order(symbol, 'market', 'buy', quantity, None, order_params)
-                            print(f"✅ ACHAT RÉEL EXÉCUTÉ: {order}")
+                            self._p(f"✅ ACHAT RÉEL EXÉCUTÉ: {order}")
                             self.trades_count += 1
                             return True
                         except Exception as order_error:
-                            print(f"❌ Erreur ordre achat: {self.exchange.id} {order_error}")
+                            self._p(f"❌ Erreur ordre achat: {self.exchange.id} {order_error}")
                             # Fallback vers simulation
                             self.actual_profit += position_size * 0.001
-                            print(f"💰 ACHAT simulé (fallback): ${position_size:.2f} de {symbol}")
+                            self._p(f"💰 ACHAT simulé (fallback): ${position_size:.2f} de {symbol}")
                             self.trades_count += 1
                             return True
                     else:
-                        print(f"❌ Solde {quote_currency} insuffisant: ${quote_balance:.2f} < ${position_size:.2f}")
-                        print(f"💰 ACHAT simulé (fallback): ${position_size:.2f} de {symbol}")
+                        self._p(f"❌ Solde {quote_currency} insuffisant: ${quote_balance:.2f} < ${position_size:.2f}")
+                        self._p(f"💰 ACHAT simulé (fallback): ${position_size:.2f} de {symbol}")
                         self.trades_count += 1
                         return True
                         
                 elif action == 'SELL':
                     # Vente réelle - utilise la quantité basée sur position_size calculée
                     quantity_to_sell = position_size / price
-                    print(f"💰 TENTATIVE VENTE RÉELLE: {quantity_to_sell:.8f} {base_currency} de {symbol} à ${price:.2f}")
+                    self._p(f"💰 TENTATIVE VENTE RÉELLE: {quantity_to_sell:.8f} {base_currency} de {symbol} à ${price:.2f}")
                     
                     # Vérifier qu'on a assez de cette crypto
                     if crypto_balance >= quantity_to_sell:
@@ -525,75 +688,81 @@ class EarlyBotTrading:
                             order_params = {}
                             if base_currency in self.accounts:
                                 order_params['account_id'] = self.accounts[base_currency]
-                                print(f"💡 Utilisation account_id pour {base_currency}: {self.accounts[base_currency][:12]}...")
+                                self._p(f"💡 Utilisation account_id pour {base_currency}: {self.accounts[base_currency][:12]}...")
                             
                             order = self.exchange.create_order(symbol, 'market', 'sell', quantity_to_sell, None, order_params)
-                            print(f"✅ VENTE RÉELLE EXÉCUTÉE: {order}")
+                            self._p(f"✅ VENTE RÉELLE EXÉCUTÉE: {order}")
                             self.trades_count += 1
                             return True
                         except Exception as order_error:
-                            print(f"❌ Erreur ordre vente: {self.exchange.id} {order_error}")
+                            self._p(f"❌ Erreur ordre vente: {self.exchange.id} {order_error}")
                             # Fallback vers simulation
                             self.actual_profit += position_size * 0.001
-                            print(f"💰 VENTE simulée (fallback): {symbol}")
+                            self._p(f"💰 VENTE simulée (fallback): {symbol}")
                             self.trades_count += 1
                             return True
                     else:
-                        print(f"❌ Balance {base_currency} insuffisante: {crypto_balance:.8f} < {quantity_to_sell:.8f}")
+                        self._p(f"❌ Balance {base_currency} insuffisante: {crypto_balance:.8f} < {quantity_to_sell:.8f}")
                         # Essaie de vendre ce qu'on a si c'est > minimum
                         if crypto_balance > 0 and crypto_balance * price > 0.01:  # Au moins 1 centime
                             try:
                                 order = self.exchange.create_order(symbol, 'market', 'sell', crypto_balance, None, {})
-                                print(f"✅ VENTE PARTIELLE: {crypto_balance:.8f} {base_currency}")
+                                self._p(f"✅ VENTE PARTIELLE: {crypto_balance:.8f} {base_currency}")
                                 self.trades_count += 1
                                 return True
                             except Exception as e:
-                                print(f"❌ Erreur vente partielle: {e}")
-                        print(f"💰 VENTE simulée (fallback): {symbol}")
+                                self._p(f"❌ Erreur vente partielle: {e}")
+                        self._p(f"💰 VENTE simulée (fallback): {symbol}")
                         self.trades_count += 1
                         return True
                         
             except Exception as e:
-                print(f"❌ Erreur lors du trade réel: {e}")
+                self._p(f"❌ Erreur lors du trade réel: {e}")
                 # En cas d'erreur, faire un trade simulé
                 if action == 'BUY':
                     self.actual_profit += position_size * 0.001
-                    print(f"💰 ACHAT simulé (fallback): ${position_size:.2f} de {symbol}")
+                    self._p(f"💰 ACHAT simulé (fallback): ${position_size:.2f} de {symbol}")
                 elif action == 'SELL':
                     self.actual_profit += position_size * 0.001
-                    print(f"💰 VENTE simulée (fallback): {symbol}")
+                    self._p(f"💰 VENTE simulée (fallback): {symbol}")
                 
                 self.trades_count += 1
                 return True
                 
         except Exception as e:
-            print(f"❌ Erreur générale exécution trade: {e}")
+            self._p(f"❌ Erreur générale exécution trade: {e}")
         
         return False
     
     def trading_loop(self):
         """Boucle principale de trading pilotée par l'IA Quantique"""
-        print("🤖 DÉMARRAGE BOT IA TRADING AUTOMATISÉ - QUANTUM AI INTÉGRÉE")
-        print("=" * 60)
+        self._start_log_drain()
+        self._p("🤖 DÉMARRAGE BOT IA TRADING AUTOMATISÉ - QUANTUM AI INTÉGRÉE")
+        self._p("=" * 60)
         
         # Activation de l'IA Quantique
         if self.ai.activate():
-            print("🧠 IA Quantique ACTIVÉE - Prise de contrôle des décisions")
+            self._p("🧠 IA Quantique ACTIVÉE - Prise de contrôle des décisions")
         
         cycle = 0
         while self.is_running:
             try:
                 cycle += 1
                 self.last_cycle_time = datetime.now()
-                print(f"\n🔄 CYCLE {cycle} - {self.last_cycle_time.strftime('%H:%M:%S')}")
+                self._p(f"\n🔄 CYCLE {cycle} - {time.strftime('%H:%M:%S')}")
                 
                 # Mise à jour balance
                 self.get_portfolio_balance()
                 
+                # Requêtes OHLCV lancées en parallèle: un aller-retour réseau au lieu de N
+                symbols = self.config['symbols']
+                market_data_futures = {symbol: self._io_pool.submit(self.get_market_data, symbol)
+                                       for symbol in symbols}
+                
                 # Analyse IA + Analyse technique de chaque symbole
-                for symbol in self.config['symbols']:
+                for symbol in symbols:
                     # Analyse technique traditionnelle
-                    technical_signal = self.analyze_symbol(symbol)
+                    technical_signal = self.analyze_symbol(symbol, market_data_futures[symbol].result())
                     
                     # Analyse par l'IA Quantique (DÉCISION PRIORITAIRE)
                     ai_decision = self.ai.should_open_position(symbol, 
@@ -613,15 +782,15 @@ class EarlyBotTrading:
                             'ai_decision': ai_decision
                         }
                         
-                        print(f"🧠 IA DÉCISION {symbol}: {ai_decision['action']} (confiance: {ai_decision['confidence']:.2f})")
-                        print(f"   🔬 Raisonnement IA: {ai_decision['reasoning']}")
+                        self._p(f"🧠 IA DÉCISION {symbol}: {ai_decision['action']} (confiance: {ai_decision['confidence']:.2f})")
+                        self._p(f"   🔬 Raisonnement IA: {ai_decision['reasoning']}")
                     else:
                         # Fallback sur analyse technique classique
                         enhanced_signal = {**technical_signal, 'ai_enhanced': False}
-                        print(f"📊 Technique {symbol}: {technical_signal['signal']} | Force: {technical_signal['strength']}")
+                        self._p(f"📊 Technique {symbol}: {technical_signal['signal']} | Force: {technical_signal['strength']}")
                     
                     self.signals[symbol] = enhanced_signal
-                    print(f"   Raison: {enhanced_signal.get('reason', 'N/A')}")
+                    self._p(f"   Raison: {enhanced_signal.get('reason', 'N/A')}")
                     
                     # Exécution du trade si conditions remplies
                     if self.is_trading:
@@ -629,29 +798,38 @@ class EarlyBotTrading:
                 
                 # Statistiques avec IA
                 ai_status = self.ai.get_ai_status()
-                print(f"\n📊 STATISTIQUES TRADING + IA:")
-                print(f"   🤖 Trades exécutés: {self.trades_count}")
-                print(f"   💰 Profit estimé: ${self.actual_profit:.2f}")
-                print(f"   🧠 Décisions IA: {ai_status['decisions_made']}")
-                print(f"   ⚡ Cohérence Quantique: {ai_status['quantum_state']['coherence']:.1f}%")
-                print(f"   📈 Derniers signaux: {len([s for s in self.signals.values() if s['signal'] != 'HOLD'])}")
+                self._p(f"\n📊 STATISTIQUES TRADING + IA:")
+                self._p(f"   🤖 Trades exécutés: {self.trades_count}")
+                self._p(f"   💰 Profit estimé: ${self.actual_profit:.2f}")
+                self._p(f"   🧠 Décisions IA: {ai_status['decisions_made']}")
+                self._p(f"   ⚡ Cohérence Quantique: {ai_status['quantum_state']['coherence']:.1f}%")
+                self._p(f"   📈 Derniers signaux: {len([s for s in self.signals.values() if s['signal'] != 'HOLD'])}")
+                
+                # Sauvegarde périodique: le thread de boucle est daemon, l'arrêt peut ne jamais l'atteindre
+                if cycle % OHLCV_CACHE_SAVE_EVERY == 0:
+                    self._save_ohlcv_cache()
                 
                 # Pause
-                print(f"\n⏳ Pause {self.config['trading_interval']} secondes avant prochain cycle...")
+                self._p(f"\n⏳ Pause {self.config['trading_interval']} secondes avant prochain cycle...")
                 time.sleep(self.config['trading_interval'])
                 
             except KeyboardInterrupt:
-                print("🛑 Arrêt demandé par l'utilisateur")
+                self._p("🛑 Arrêt demandé par l'utilisateur")
                 break
             except Exception as e:
-                print(f"❌ Erreur dans la boucle trading: {e}")
+                self._p(f"❌ Erreur dans la boucle trading: {e}")
                 time.sleep(5)
         
+        self._save_ohlcv_cache()
+        
         # Désactivation de l'IA
         self.ai.deactivate()
-        print("🛑 Arrêt du bot IA - IA Quantique désactivée")
+        self._p("🛑 Arrêt du bot IA - IA Quantique désactivée")
         self.is_running = False
         self.is_trading = False
+        
+        # Dernières lignes écrites avant de rendre la main
+        self._stop_log_drain()
     
     def change_trading_mode(self, mode_name):
         """Change le mode de trading"""
@@ -660,6 +838,7 @@ class EarlyBotTrading:
             # Met à jour la configuration
             mode_config = TRADING_MODES[mode_name]
             self.config.update(mode_config)
+            self._refresh_indicator_params()
             print(f"✅ Mode changé vers: {mode_config['name']}")
             print(f"   📊 Risque: {mode_config['risk_level']}")
             print(f"   💰 Position max: {mode_config['max_position_size']*100}%")
@@ -1553,7 +1732,7 @@ def get_signals():
     global bot
     if bot is None:
         return jsonify({'error': 'Bot non initialisé'})
-    return jsonify({'signals': bot.signals})
+    return jsonify({'signals': bot.export_signals()})
 
 @app.route('/api/change-mode', methods=['POST'])
 def change_mode():
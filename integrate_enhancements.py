@@ -142,16 +142,21 @@ def install_dependencies():
         "seaborn>=0.11.0"
     ]
     
+    # Nom d'import quand il diffère du nom de paquet pip
+    import_names = {"scikit-learn": "sklearn"}
+    
     try:
+        import importlib.util
         import subprocess
         import sys
         
         for dep in dependencies:
-            print(f"   Vérification {dep.split('>=')[0]}...")
-            try:
-                __import__(dep.split('>=')[0])
-                print(f"   ✅ {dep.split('>=')[0]} déjà installé")
-            except ImportError:
+            package = dep.split('>=')[0]
+            print(f"   Vérification {package}...")
+            # find_spec localise le module sans exécuter son code d'import
+            if importlib.util.find_spec(import_names.get(package, package)) is not None:
+                print(f"   ✅ {package} déjà installé")
+            else:
                 print(f"   📦 Installation de {dep}...")
                 subprocess.check_call([sys.executable, '-m', 'pip', 'install', dep])
                 print(f"   ✅ {dep} installé")